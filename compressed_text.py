@@ -0,0 +1,26 @@
+import os
+import zlib
+
+# Large text payloads (terminal logs, uploaded source files) are kept
+# zlib-compressed at rest and decompressed only when displayed or rendered.
+# ASCII logs typically shrink 5-10x; level 1 keeps saves fast.
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", 4096))
+COMPRESS_LEVEL = 1
+
+
+# Return the text itself below the threshold, otherwise its compressed UTF-8 bytes
+def pack_text(text):
+    if len(text) < COMPRESS_MIN_BYTES:
+        return text
+    data = text.encode("utf-8")
+    packed = zlib.compress(data, COMPRESS_LEVEL)
+    # Incompressible payloads are not worth the decompression cost
+    if len(packed) >= len(data):
+        return text
+    return packed
+
+
+def unpack_text(value):
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value
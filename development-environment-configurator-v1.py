@@ -1,6 +1,7 @@
 import streamlit as st
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
+from text_wrap import wrap_text_lines
 import io
 from datetime import datetime
 import traceback
@@ -75,11 +76,11 @@ def generate_pdf():
             y_position = height - 50
         c.drawString(100, y_position, f"Iteration #{i + 1}:") # changed here too
         y_position -= 20
-        for line in content.split('\n'):
+        for line in wrap_text_lines(content, "Helvetica", 12, width - 120 - 50):
             if y_position < 50:
                 c.showPage()
                 y_position = height - 50
-            c.drawString(120, y_position, line[:80])
+            c.drawString(120, y_position, line)
             y_position -= 15
         y_position -= 20
 
@@ -1,13 +1,15 @@
 import streamlit as st
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
+from text_wrap import wrap_text_lines
+from edit_history import TextHistory
 import io
 from datetime import datetime
 import google.generativeai as genai
 
 # Initialize session state
 if 'iteration_history' not in st.session_state:
-    st.session_state.iteration_history = []  # List of all iteration states
+    st.session_state.iteration_history = TextHistory()  # All iteration states, stored as line deltas
 if 'current_iteration' not in st.session_state:
     st.session_state.current_iteration = "# MyApp"  # Default value
 if 'ai_generated_code' not in st.session_state:
@@ -41,7 +43,7 @@ current_iteration = st.text_area(
 )
 
 # Action buttons
-col1, col2, col3, col4, col5 = st.columns(5)
+col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
 with col1:
     save_iteration = st.button("Save Iteration")
 with col2:
@@ -52,6 +54,10 @@ with col4:
     generate_ai = st.button("Generate AI Code")
 with col5:
     clear_iteration = st.button("Clear Current Iteration")
+with col6:
+    undo_save = st.button("Undo Save", disabled=not st.session_state.iteration_history.can_undo)
+with col7:
+    redo_save = st.button("Redo Save", disabled=not st.session_state.iteration_history.can_redo)
 
 # Save current iteration to history
 if save_iteration and current_iteration.strip():
@@ -60,6 +66,14 @@ if save_iteration and current_iteration.strip():
     st.session_state.clear_iteration_trigger = False
     st.rerun()
 
+# Undo/redo saved iterations
+if undo_save:
+    st.session_state.iteration_history.undo()
+    st.rerun()
+if redo_save:
+    st.session_state.iteration_history.redo()
+    st.rerun()
+
 # Clear current iteration
 if clear_iteration:
     st.session_state.clear_iteration_trigger = True
@@ -87,11 +101,11 @@ def generate_pdf():
             y = height - 50
         c.drawString(100, y, f"Iteration #{i + 1}")
         y -= 20
-        for line in content.split('\n'):
+        for line in wrap_text_lines(content, "Helvetica", 12, width - 120 - 50):
             if y < 50:
                 c.showPage()
                 y = height - 50
-            c.drawString(120, y, line[:80])
+            c.drawString(120, y, line)
             y -= 15
     
     if current_iteration not in st.session_state.iteration_history:
@@ -100,11 +114,11 @@ def generate_pdf():
             y = height - 50
         c.drawString(100, y, f"Iteration #{len(st.session_state.iteration_history) + 1} (Current)")
         y -= 20
-        for line in current_iteration.split('\n'):
+        for line in wrap_text_lines(current_iteration, "Helvetica", 12, width - 120 - 50):
             if y < 50:
                 c.showPage()
                 y = height - 50
-            c.drawString(120, y, line[:80])
+            c.drawString(120, y, line)
             y -= 15
     
     c.save()
@@ -201,7 +215,7 @@ if st.session_state.ai_generated_code:
 
 # Clear everything
 if st.button("Clear All"):
-    st.session_state.iteration_history = []
+    st.session_state.iteration_history = TextHistory()
     st.session_state.ai_generated_code = []
     st.session_state.reset_trigger = True
     st.session_state.clear_iteration_trigger = False
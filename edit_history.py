@@ -0,0 +1,204 @@
+import difflib
+
+# Undo/redo without copying whole projects. PersistentMap versions share every
+# bucket they did not change, so an edit costs one bucket plus the bucket
+# table instead of a full dict copy. TextHistory keeps successive texts as
+# line deltas against the previous one, with a full checkpoint every
+# CHECKPOINT_EVERY entries to bound reconstruction.
+BUCKETS = 64
+CHECKPOINT_EVERY = 20
+
+
+class PersistentMap:
+    __slots__ = ("_buckets", "_len")
+
+    def __init__(self, items=None):
+        buckets = [None] * BUCKETS
+        count = 0
+        for key, value in (items or {}).items():
+            index = hash(key) % BUCKETS
+            if buckets[index] is None:
+                buckets[index] = {}
+            buckets[index][key] = value
+            count += 1
+        self._buckets = tuple(buckets)
+        self._len = count
+
+    @classmethod
+    def _from_buckets(cls, buckets, length):
+        new = cls.__new__(cls)
+        new._buckets = buckets
+        new._len = length
+        return new
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, key):
+        bucket = self._buckets[hash(key) % BUCKETS]
+        return bucket is not None and key in bucket
+
+    def __getitem__(self, key):
+        bucket = self._buckets[hash(key) % BUCKETS]
+        if bucket is None:
+            raise KeyError(key)
+        return bucket[key]
+
+    def get(self, key, default=None):
+        bucket = self._buckets[hash(key) % BUCKETS]
+        return default if bucket is None else bucket.get(key, default)
+
+    def items(self):
+        for bucket in self._buckets:
+            if bucket:
+                yield from bucket.items()
+
+    def __iter__(self):
+        for key, _ in self.items():
+            yield key
+
+    # New map with key set to value; shares all other buckets with this one
+    def set(self, key, value):
+        index = hash(key) % BUCKETS
+        old = self._buckets[index]
+        if old is not None and key in old and old[key] is value:
+            return self
+        bucket = dict(old) if old else {}
+        length = self._len + (0 if key in bucket else 1)
+        bucket[key] = value
+        buckets = list(self._buckets)
+        buckets[index] = bucket
+        return PersistentMap._from_buckets(tuple(buckets), length)
+
+    def delete(self, key):
+        index = hash(key) % BUCKETS
+        old = self._buckets[index]
+        if old is None or key not in old:
+            return self
+        bucket = dict(old)
+        del bucket[key]
+        buckets = list(self._buckets)
+        buckets[index] = bucket or None
+        return PersistentMap._from_buckets(tuple(buckets), self._len - 1)
+
+
+# Linear undo/redo over immutable states
+class UndoHistory:
+    __slots__ = ("_states", "_cursor")
+
+    def __init__(self, initial):
+        self._states = [initial]
+        self._cursor = 0
+
+    @property
+    def current(self):
+        return self._states[self._cursor]
+
+    @property
+    def can_undo(self):
+        return self._cursor > 0
+
+    @property
+    def can_redo(self):
+        return self._cursor < len(self._states) - 1
+
+    # Make state current, dropping anything that could have been redone
+    def push(self, state):
+        if state is self.current:
+            return
+        del self._states[self._cursor + 1:]
+        self._states.append(state)
+        self._cursor += 1
+
+    def undo(self):
+        if self.can_undo:
+            self._cursor -= 1
+        return self.current
+
+    def redo(self):
+        if self.can_redo:
+            self._cursor += 1
+        return self.current
+
+
+def _line_delta(old_lines, new_lines):
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [(i1, i2, new_lines[j1:j2]) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+def _apply_delta(old_lines, delta):
+    lines = []
+    position = 0
+    for i1, i2, replacement in delta:
+        lines.extend(old_lines[position:i1])
+        lines.extend(replacement)
+        position = i2
+    lines.extend(old_lines[position:])
+    return lines
+
+
+# List of texts stored as line deltas, with undo/redo of appends
+class TextHistory:
+    def __init__(self):
+        self._entries = []  # ("full", lines) or ("delta", ops against the previous entry)
+        self._length = 0    # entries past this point can be redone
+        self._cache = (-1, None)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return "".join(self._lines(index))
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield "".join(self._lines(index))
+
+    def __contains__(self, text):
+        return any(entry == text for entry in self)
+
+    def _lines(self, index):
+        cached_index, cached_lines = self._cache
+        if cached_index == index:
+            return cached_lines
+        # Start from the cached entry when it is on the way, otherwise the last checkpoint
+        start = index - index % CHECKPOINT_EVERY
+        if start <= cached_index < index:
+            start, lines = cached_index + 1, cached_lines
+        else:
+            lines = self._entries[start][1]
+            start += 1
+        for position in range(start, index + 1):
+            lines = _apply_delta(lines, self._entries[position][1])
+        self._cache = (index, lines)
+        return lines
+
+    def append(self, text):
+        del self._entries[self._length:]
+        lines = text.splitlines(keepends=True)
+        if self._length % CHECKPOINT_EVERY == 0:
+            self._entries.append(("full", lines))
+        else:
+            self._entries.append(("delta", _line_delta(self._lines(self._length - 1), lines)))
+        self._length += 1
+        self._cache = (self._length - 1, lines)
+
+    @property
+    def can_undo(self):
+        return self._length > 0
+
+    @property
+    def can_redo(self):
+        return self._length < len(self._entries)
+
+    def undo(self):
+        if self.can_undo:
+            self._length -= 1
+
+    def redo(self):
+        if self.can_redo:
+            self._length += 1
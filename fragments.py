@@ -0,0 +1,30 @@
+import streamlit as st
+
+# Independently rerunnable app sections. A function decorated with @fragment
+# reruns on its own when one of its widgets changes (st.fragment, or
+# st.experimental_fragment on Streamlit 1.33-1.36); on older releases it just
+# runs as part of the full script rerun, as before. Dependencies between
+# sections are explicit: a section that renders some items declares them with
+# showing(topic, items), and a fragment that changes an item calls
+# changed(topic, item), which reruns the whole app only if that item is on screen.
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+FRAGMENTS_SUPPORTED = fragment is not None
+
+if not FRAGMENTS_SUPPORTED:
+    def fragment(func):
+        return func
+
+
+def showing(topic, items):
+    st.session_state[f"showing-{topic}"] = set(items)
+
+
+def changed(topic, item):
+    if item in st.session_state.get(f"showing-{topic}", ()):
+        rerun_app()
+
+
+# Rerun every section; without fragments the whole script is already rerunning
+def rerun_app():
+    if FRAGMENTS_SUPPORTED:
+        st.rerun()
@@ -0,0 +1,40 @@
+import hashlib
+from io import BytesIO
+
+from PIL import Image as PILImage
+
+# Uploaded screenshots are stored once per content hash. Next to the original
+# bytes we keep a rendition downsampled to the size the PDF draws it at.
+PDF_IMAGE_WIDTH = 200
+PDF_IMAGE_HEIGHT = 150
+PDF_IMAGE_DPI = 150
+JPEG_QUALITY = 80
+
+
+def image_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# Downsample and recompress an image for a box of width x height points at the given DPI
+def make_pdf_rendition(data, width=PDF_IMAGE_WIDTH, height=PDF_IMAGE_HEIGHT, dpi=PDF_IMAGE_DPI):
+    target = (max(1, round(width * dpi / 72)), max(1, round(height * dpi / 72)))
+    with PILImage.open(BytesIO(data)) as img:
+        img.draft("RGB", target)
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        img = img.convert("RGBA" if has_alpha else "RGB")
+        if img.size[0] > target[0] or img.size[1] > target[1]:
+            img = img.resize(target, PILImage.LANCZOS)
+        out = BytesIO()
+        if has_alpha:
+            img.save(out, format="PNG", optimize=True)
+        else:
+            img.save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return out.getvalue()
+
+
+# Add an uploaded image to the blob store, returning its hash; duplicates are stored once
+def ingest_image(image_blobs, data):
+    key = image_hash(data)
+    if key not in image_blobs:
+        image_blobs[key] = {"data": data, "pdf": make_pdf_rendition(data)}
+    return key
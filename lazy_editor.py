@@ -0,0 +1,47 @@
+import os
+
+import streamlit as st
+from streamlit_ace import st_ace
+
+# Each st_ace editor is an iframe with its own copy of the Ace bundle, so a page
+# with many code sections mounts only a few of them. Closed sections show a
+# read-only preview of their text and an "Edit" button; opening one mounts its
+# editor and, past MAX_LIVE_EDITORS, closes the one opened longest ago. The
+# text of every section is kept in session state, so closing loses nothing.
+MAX_LIVE_EDITORS = int(os.environ.get("MAX_LIVE_EDITORS", 3))
+PREVIEW_LINES = 15
+
+
+def _open_editor(key):
+    live = st.session_state.setdefault("live_editors", [])
+    if key in live:
+        live.remove(key)
+    live.append(key)
+    del live[:-MAX_LIVE_EDITORS]
+
+
+def _close_editor(key):
+    live = st.session_state.setdefault("live_editors", [])
+    if key in live:
+        live.remove(key)
+
+
+# A code editor that is only mounted while open; returns the section's current text
+def lazy_ace(key, language, placeholder="", theme="monokai"):
+    text_key = f"{key}-text"
+    text = st.session_state.get(text_key, "")
+    if key in st.session_state.get("live_editors", []):
+        text = st_ace(value=text, language=language, theme=theme, key=key, placeholder=placeholder)
+        st.session_state[text_key] = text
+        st.button("Close Editor", key=f"{key}-close", on_click=_close_editor, args=(key,))
+    else:
+        lines = text.splitlines()
+        if lines:
+            preview = "\n".join(lines[:PREVIEW_LINES])
+            if len(lines) > PREVIEW_LINES:
+                preview += f"\n... ({len(lines) - PREVIEW_LINES} more lines)"
+            st.code(preview, language=language)
+        else:
+            st.caption(placeholder or "Empty")
+        st.button("Edit", key=f"{key}-open", on_click=_open_editor, args=(key,))
+    return text
@@ -0,0 +1,85 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+# Rendered PDF sections (one app version, or a whole report) are cached on disk
+# by content hash and evicted least-recently-used first once the cache grows
+# past its budget. Builds are reproducible, so a cached file is byte-identical
+# to a fresh render of the same snapshot.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "sections")
+CACHE_MAX_BYTES = int(os.environ.get("PDF_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+# Sections used this recently are never evicted, so a running merge keeps its inputs
+EVICT_MIN_AGE_SECONDS = 10 * 60
+SECTION_SUFFIX = ".pdf"
+# Bump whenever the report layout changes so stale renders are not reused
+LAYOUT_VERSION = "3"
+
+
+# Hash everything that ends up on a version's pages
+def section_key(version_snapshot, layout="standard"):
+    payload = json.dumps(version_snapshot, sort_keys=True, ensure_ascii=False, default=str)
+    digest = hashlib.sha256()
+    digest.update(f"{LAYOUT_VERSION}:{layout}:".encode())
+    digest.update(payload.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _section_path(key):
+    return os.path.join(CACHE_DIR, f"{key}{SECTION_SUFFIX}")
+
+
+# Return the cached section for a key, marking it as recently used
+def get_cached_section(key):
+    path = _section_path(key)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+# Move (or copy) a freshly rendered section into the cache and return its cached path
+def store_section(key, part_path, copy=False):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _section_path(key)
+    if copy:
+        fd, tmp_path = tempfile.mkstemp(suffix=".pdf.part", dir=CACHE_DIR)
+        os.close(fd)
+        shutil.copyfile(part_path, tmp_path)
+        part_path = tmp_path
+    os.replace(part_path, path)
+    evict_sections()
+    return path
+
+
+# Drop least-recently-used sections until the cache fits its budget
+def evict_sections(max_bytes=CACHE_MAX_BYTES, min_age=EVICT_MIN_AGE_SECONDS):
+    if not os.path.isdir(CACHE_DIR):
+        return
+    cutoff = time.time() - min_age
+    entries = []
+    total = 0
+    for entry in os.scandir(CACHE_DIR):
+        # Only completed sections; *.pdf.part files are still being written by store_section
+        if not entry.name.endswith(SECTION_SUFFIX):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total += stat.st_size
+    entries.sort()
+    for mtime, size, path in entries:
+        if total <= max_bytes:
+            break
+        if mtime > cutoff:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -0,0 +1,77 @@
+import os
+import html
+import time
+import hashlib
+import tempfile
+
+# Generated reports are spooled to disk under ./static/reports and served by
+# Streamlit's static file handler (server.enableStaticServing in
+# .streamlit/config.toml). The handler streams the file in chunks and sets
+# Content-Length and an ETag, so the PDF never travels through the websocket.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+REPORTS_DIR = os.path.join(STATIC_DIR, "reports")
+REPORTS_URL = "app/static/reports"
+REPORT_MAX_AGE_SECONDS = 6 * 60 * 60
+CHUNK_SIZE = 1024 * 1024
+# Streamlit's static file handler answers 404 for files larger than this
+STATIC_MAX_BYTES = 200 * 1024 * 1024
+
+
+# Reserve a temp file next to the published reports so the final rename is atomic
+def spool_pdf_file(extension=".pdf"):
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=f"{extension}.part", dir=REPORTS_DIR)
+    os.close(fd)
+    return path
+
+
+# Hash the spooled file in chunks and publish it under its content hash
+def publish_pdf_file(spooled_path, extension=".pdf"):
+    digest = hashlib.sha256()
+    with open(spooled_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    file_name = f"{digest.hexdigest()}{extension}"
+    published_path = os.path.join(REPORTS_DIR, file_name)
+    os.replace(spooled_path, published_path)
+    cleanup_old_reports()
+    return published_path
+
+
+# Remove published reports and abandoned spool files older than the max age
+def cleanup_old_reports(max_age=REPORT_MAX_AGE_SECONDS):
+    if not os.path.isdir(REPORTS_DIR):
+        return
+    cutoff = time.time() - max_age
+    for entry in os.scandir(REPORTS_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def format_file_size(num_bytes):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+
+# Whether the static file handler will serve a published file
+def is_servable(published_path):
+    return os.path.getsize(published_path) <= STATIC_MAX_BYTES
+
+
+# Function to create download link for a published PDF (or other spooled) file; files the
+# static handler would refuse get a note with their location on the server instead
+def create_download_link_file(published_path, download_filename, label="Download PDF"):
+    size = format_file_size(os.path.getsize(published_path))
+    if not is_servable(published_path):
+        return (f"<p><b>{html.escape(download_filename)}</b> is {size}, more than the "
+                f"{format_file_size(STATIC_MAX_BYTES)} the app can serve for download. It was saved on the server "
+                f"as <code>{html.escape(published_path)}</code>; copy it from there (for example with scp) "
+                f"within {REPORT_MAX_AGE_SECONDS // 3600} hours, before old reports are cleaned up.</p>")
+    url = f"{REPORTS_URL}/{os.path.basename(published_path)}"
+    href = f'<a href="{url}" download="{download_filename}" target="_blank">{label}</a> ({size})'
+    return href
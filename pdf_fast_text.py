@@ -0,0 +1,135 @@
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+from text_wrap import wrap_text_lines
+from pdf_themes import DEFAULT_THEME, MONO_STYLE_NAMES, REPRODUCIBLE_BUILDS, get_theme
+
+# "Fast text" report mode: draws straight onto the canvas with text objects
+# instead of laying out platypus flowables.
+HEADING_FONTS = {1: ("Helvetica-Bold", 18, 22), 2: ("Helvetica-Bold", 14, 18), 3: ("Helvetica-Bold", 12, 15)}
+BODY_FONT = ("Helvetica", 10, 12)
+
+
+class CanvasTextWriter:
+    def __init__(self, pdf_path, theme):
+        self.canvas = canvas.Canvas(pdf_path, pagesize=theme["pagesize"], invariant=REPRODUCIBLE_BUILDS)
+        self.width, self.height = theme["pagesize"]
+        self.margins = theme["margins"]
+        self.frame_width = self.width - self.margins["left"] - self.margins["right"]
+        self.y_position = self.height - self.margins["top"]
+        # (font, size, leading, indent) per monospace section, taken from the theme's styles
+        self.mono_fonts = {}
+        for kind, style_name in MONO_STYLE_NAMES.items():
+            style = theme["styles"][style_name]
+            self.mono_fonts[kind] = (style.fontName, style.fontSize, style.leading, style.leftIndent)
+
+    def new_page(self):
+        self.canvas.showPage()
+        self.y_position = self.height - self.margins["top"]
+
+    def space(self, amount):
+        self.y_position -= amount
+        if self.y_position < self.margins["bottom"]:
+            self.new_page()
+
+    # Draw lines with one text object per page run instead of one drawString per line
+    def draw_lines(self, lines, font, size, leading, x):
+        index = 0
+        while index < len(lines):
+            if self.y_position - leading < self.margins["bottom"]:
+                self.new_page()
+            fit = int((self.y_position - self.margins["bottom"]) // leading)
+            text = self.canvas.beginText(x, self.y_position - size)
+            text.setFont(font, size, leading)
+            text.textLines(lines[index:index + fit], trim=0)
+            self.canvas.drawText(text)
+            drawn = min(fit, len(lines) - index)
+            self.y_position -= drawn * leading
+            index += drawn
+
+    def heading(self, text, level):
+        font, size, leading = HEADING_FONTS[level]
+        if self.y_position - 3 * leading < self.margins["bottom"]:
+            self.new_page()
+        self.space(leading / 2)
+        self.draw_lines(simpleSplit(text, font, size, self.frame_width), font, size, leading, self.margins["left"])
+
+    def paragraph(self, text):
+        font, size, leading = BODY_FONT
+        self.draw_lines(simpleSplit(text, font, size, self.frame_width), font, size, leading, self.margins["left"])
+
+    # Wrap monospace text to the frame width; fixed-pitch fonts wrap by character count
+    def monospace(self, text, kind):
+        font, size, leading, indent = self.mono_fonts[kind]
+        max_width = self.frame_width - 2 * indent
+        self.draw_lines(wrap_text_lines(text, font, size, max_width), font, size, leading, self.margins["left"] + indent)
+
+    def save(self):
+        self.canvas.save()
+
+
+# Render a snapshot through the canvas fast path; on_flowable is called once per entry
+def build_fast_text_pdf(snapshot, pdf_path, on_flowable=None, on_start=None, theme_name=DEFAULT_THEME):
+    if on_start is not None:
+        total = 0
+        for app_version in snapshot["task_list"]:
+            total += 1
+            for key in ("requirements_dict", "text_dict", "terminal_dict", "code_dict"):
+                total += len(snapshot[key].get(app_version, []))
+        on_start(total)
+
+    def entry_done():
+        if on_flowable is not None:
+            on_flowable(None)
+
+    writer = CanvasTextWriter(pdf_path, get_theme(theme_name))
+    for index, app_version in enumerate(snapshot["task_list"]):
+        if index:
+            writer.new_page()
+        writer.heading(f"App Version: {app_version}", 1)
+        if app_version in snapshot["interpreter_dict"]:
+            writer.paragraph(f"Interpreter Version: {snapshot['interpreter_dict'][app_version]}")
+            writer.space(12)
+        entry_done()
+
+        if app_version in snapshot["requirements_dict"]:
+            writer.heading("requirements.txt:", 2)
+            entries = snapshot["requirements_dict"][app_version]
+            for i, req in enumerate(entries):
+                if len(entries) > 1:
+                    writer.heading(f"Entry {i+1}:", 3)
+                writer.paragraph(f"Project Type: {req['project_type']}")
+                writer.paragraph(f"Python Version: {req['python_version']}")
+                writer.space(8)
+                writer.monospace(req['content'], "requirements")
+                writer.space(12)
+                entry_done()
+
+        if app_version in snapshot["text_dict"]:
+            writer.heading("Notes:", 2)
+            for text in snapshot["text_dict"][app_version]:
+                writer.paragraph(f"• {text}")
+                entry_done()
+            writer.space(12)
+
+        if app_version in snapshot["terminal_dict"]:
+            writer.heading("Terminal Outputs:", 2)
+            outputs = snapshot["terminal_dict"][app_version]
+            for i, output in enumerate(outputs):
+                if len(outputs) > 1:
+                    writer.heading(f"Output {i+1}:", 3)
+                writer.monospace(output, "terminal")
+                writer.space(12)
+                entry_done()
+
+        if app_version in snapshot["code_dict"]:
+            writer.heading("Code Sections:", 2)
+            sections = snapshot["code_dict"][app_version]
+            for i, code in enumerate(sections):
+                if len(sections) > 1:
+                    writer.heading(f"Code Section {i+1}:", 3)
+                writer.monospace(code, "code")
+                writer.space(12)
+                entry_done()
+
+    writer.save()
+    return pdf_path
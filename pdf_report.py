@@ -0,0 +1,145 @@
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
+from text_wrap import wrap_text_lines
+from pdf_themes import DEFAULT_THEME, get_theme, doc_template_kwargs
+
+# Keys of a report snapshot (see ProjectStore.snapshot)
+SNAPSHOT_KEYS = ["task_list", "interpreter_dict", "requirements_dict", "text_dict", "terminal_dict", "code_dict"]
+
+
+# Narrow a snapshot down to a single app version
+def version_snapshot(snapshot, app_version):
+    narrowed = {"task_list": [app_version]}
+    for key in SNAPSHOT_KEYS:
+        if key != "task_list":
+            narrowed[key] = {app_version: snapshot[key][app_version]} if app_version in snapshot[key] else {}
+    return narrowed
+
+
+# Usable frame size of a letter page with the report margins and frame padding
+FRAME_WIDTH = letter[0] - 2 * 36 - 12
+FRAME_HEIGHT = letter[1] - 2 * 72 - 12
+
+
+# Preformatted block built from lines that are already wrapped
+class PreformattedChunk(Preformatted):
+    def __init__(self, lines, style):
+        self.style = style
+        self.bulletText = None
+        self.lines = lines
+
+
+# Wrap long text once to the frame width and cut it into page-sized Preformatted
+# blocks, so layout never has to split one huge flowable again and again
+def chunked_preformatted(text, style, frame_width=FRAME_WIDTH, frame_height=FRAME_HEIGHT):
+    lines = text.split('\n')
+    while lines and not lines[0].strip():
+        lines.pop(0)
+    while lines and not lines[-1].strip():
+        lines.pop()
+    if not lines:
+        return [Preformatted(text, style)]
+    max_width = frame_width - style.leftIndent - style.rightIndent
+    lines = wrap_text_lines('\n'.join(lines), style.fontName, style.fontSize, max_width)
+    lines_per_chunk = max(1, int(frame_height // style.leading))
+    return [PreformattedChunk(lines[i:i + lines_per_chunk], style)
+            for i in range(0, len(lines), lines_per_chunk)]
+
+
+# Document template that reports each laid out element to a callback. Elements
+# split across pages come back as new pieces, so an element is reported once,
+# when the layout takes it off the list (drawn whole or split), and progress
+# never runs past the number of elements passed to build.
+class ReportDocTemplate(SimpleDocTemplate):
+    def __init__(self, filename, on_flowable=None, **kw):
+        SimpleDocTemplate.__init__(self, filename, **kw)
+        self.on_flowable = on_flowable
+        self._pending = set()  # ids of the elements not reported yet
+
+    def build(self, flowables, *args, **kw):
+        self._pending = {id(flowable) for flowable in flowables}
+        SimpleDocTemplate.build(self, flowables, *args, **kw)
+
+    def handle_flowable(self, flowables):
+        first = flowables[0]
+        SimpleDocTemplate.handle_flowable(self, flowables)
+        consumed = not flowables or flowables[0] is not first
+        if consumed and id(first) in self._pending:
+            self._pending.discard(id(first))
+            if self.on_flowable is not None:
+                self.on_flowable(first)
+
+
+# Build the flowables for a single app version
+def build_version_elements(snapshot, app_version, theme):
+    styles = theme["styles"]
+    frame_width, frame_height = theme["frame_width"], theme["frame_height"]
+    pdf_elements = []
+    pdf_elements.append(Paragraph(f"App Version: {app_version}", styles['Heading1']))
+
+    if app_version in snapshot["interpreter_dict"]:
+        pdf_elements.append(Paragraph(
+            f"Interpreter Version: {snapshot['interpreter_dict'][app_version]}",
+            styles['Normal']
+        ))
+        pdf_elements.append(Spacer(1, 12))
+
+    # Requirements Section
+    if app_version in snapshot["requirements_dict"]:
+        pdf_elements.append(Paragraph("requirements.txt:", styles['Heading2']))
+        for i, req in enumerate(snapshot["requirements_dict"][app_version]):
+            if len(snapshot["requirements_dict"][app_version]) > 1:
+                pdf_elements.append(Paragraph(f"Entry {i+1}:", styles['Heading3']))
+
+            pdf_elements.append(Paragraph(f"Project Type: {req['project_type']}", styles['Normal']))
+            pdf_elements.append(Paragraph(f"Python Version: {req['python_version']}", styles['Normal']))
+            pdf_elements.append(Spacer(1, 8))
+
+            pdf_elements.extend(chunked_preformatted(req['content'], styles['ReqStyle'], frame_width, frame_height))
+            pdf_elements.append(Spacer(1, 12))
+
+    # Notes
+    if app_version in snapshot["text_dict"]:
+        pdf_elements.append(Paragraph("Notes:", styles['Heading2']))
+        for text in snapshot["text_dict"][app_version]:
+            pdf_elements.append(Paragraph(f"• {text}", styles['Normal']))
+        pdf_elements.append(Spacer(1, 12))
+
+    # Terminal Outputs
+    if app_version in snapshot["terminal_dict"]:
+        pdf_elements.append(Paragraph("Terminal Outputs:", styles['Heading2']))
+        for i, output in enumerate(snapshot["terminal_dict"][app_version]):
+            if len(snapshot["terminal_dict"][app_version]) > 1:
+                pdf_elements.append(Paragraph(f"Output {i+1}:", styles['Heading3']))
+            pdf_elements.extend(chunked_preformatted(output, styles['TerminalStyle'], frame_width, frame_height))
+            pdf_elements.append(Spacer(1, 12))
+
+    # Code Sections
+    if app_version in snapshot["code_dict"]:
+        pdf_elements.append(Paragraph("Code Sections:", styles['Heading2']))
+        for i, code in enumerate(snapshot["code_dict"][app_version]):
+            if len(snapshot["code_dict"][app_version]) > 1:
+                pdf_elements.append(Paragraph(f"Code Section {i+1}:", styles['Heading3']))
+            pdf_elements.extend(chunked_preformatted(code, styles['CodeStyle'], frame_width, frame_height))
+            pdf_elements.append(Spacer(1, 12))
+
+    return pdf_elements
+
+
+# Build the flowables for every saved app version
+def build_report_elements(snapshot, theme):
+    pdf_elements = []
+    for app_version in snapshot["task_list"]:
+        pdf_elements.extend(build_version_elements(snapshot, app_version, theme))
+    return pdf_elements
+
+
+# Render a snapshot into a PDF file
+def build_report_pdf(snapshot, pdf_path, on_flowable=None, on_start=None, theme_name=DEFAULT_THEME):
+    theme = get_theme(theme_name)
+    doc = ReportDocTemplate(pdf_path, on_flowable=on_flowable, **doc_template_kwargs(theme))
+    pdf_elements = build_report_elements(snapshot, theme)
+    if on_start is not None:
+        on_start(len(pdf_elements))
+    doc.build(pdf_elements)
+    return pdf_path
@@ -0,0 +1,90 @@
+import os
+from functools import lru_cache
+
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+# Report themes. Each theme is compiled once per process into a stylesheet with
+# the sample styles plus the monospace styles the report uses, so building a
+# report never allocates styles per item.
+DEFAULT_THEME = "print"
+
+# Reproducible builds: reportlab's invariant mode pins the creation date and
+# document ID, so the same snapshot always renders to byte-identical output
+REPRODUCIBLE_BUILDS = os.environ.get("PDF_REPRODUCIBLE_BUILDS", "1") != "0"
+
+# Optional TrueType monospace font (e.g. DejaVuSansMono.ttf) for logs with non-Latin text
+MONO_FONT_PATH = os.environ.get("PDF_MONO_FONT_PATH", "")
+MONO_FONT_NAME = "ReportMono"
+
+THEMES = {
+    "print": {
+        "pagesize": letter,
+        "margins": {"left": 36, "right": 36, "top": 72, "bottom": 72},
+        "requirements": {"fontSize": 9, "leading": 11},
+        "terminal": {"fontSize": 8, "leading": 9},
+        "code": {"fontSize": 8, "leading": 9},
+        "indent": 10,
+    },
+    "compact": {
+        "pagesize": letter,
+        "margins": {"left": 24, "right": 24, "top": 36, "bottom": 36},
+        "requirements": {"fontSize": 7, "leading": 8},
+        "terminal": {"fontSize": 6.5, "leading": 7.5},
+        "code": {"fontSize": 6.5, "leading": 7.5},
+        "indent": 6,
+    },
+    "wide-landscape": {
+        "pagesize": landscape(letter),
+        "margins": {"left": 36, "right": 36, "top": 48, "bottom": 48},
+        "requirements": {"fontSize": 9, "leading": 11},
+        "terminal": {"fontSize": 8, "leading": 9},
+        "code": {"fontSize": 8, "leading": 9},
+        "indent": 10,
+    },
+}
+
+# Stylesheet names of the monospace section styles
+MONO_STYLE_NAMES = {"requirements": "ReqStyle", "terminal": "TerminalStyle", "code": "CodeStyle"}
+
+
+# Register optional fonts once and return the monospace font name to use
+@lru_cache(maxsize=None)
+def register_fonts():
+    if MONO_FONT_PATH and os.path.exists(MONO_FONT_PATH):
+        pdfmetrics.registerFont(TTFont(MONO_FONT_NAME, MONO_FONT_PATH))
+        return MONO_FONT_NAME
+    return "Courier"
+
+
+@lru_cache(maxsize=None)
+def get_theme(name=DEFAULT_THEME):
+    config = THEMES.get(name, THEMES[DEFAULT_THEME])
+    mono_font = register_fonts()
+    styles = getSampleStyleSheet()
+    indent = config["indent"]
+    for kind, style_name in MONO_STYLE_NAMES.items():
+        styles.add(ParagraphStyle(name=style_name, fontName=mono_font,
+                                  leftIndent=indent, rightIndent=indent, wordWrap='CJK', **config[kind]))
+
+    page_width, page_height = config["pagesize"]
+    margins = config["margins"]
+    return {
+        "name": name if name in THEMES else DEFAULT_THEME,
+        "styles": styles,
+        "pagesize": config["pagesize"],
+        "margins": margins,
+        "mono_font": mono_font,
+        # Usable frame size after margins and the 6pt frame padding on each side
+        "frame_width": page_width - margins["left"] - margins["right"] - 12,
+        "frame_height": page_height - margins["top"] - margins["bottom"] - 12,
+    }
+
+
+# Keyword arguments for SimpleDocTemplate matching a theme's page template
+def doc_template_kwargs(theme):
+    margins = theme["margins"]
+    return {"pagesize": theme["pagesize"], "leftMargin": margins["left"], "rightMargin": margins["right"],
+            "topMargin": margins["top"], "bottomMargin": margins["bottom"], "invariant": REPRODUCIBLE_BUILDS}
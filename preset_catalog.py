@@ -0,0 +1,213 @@
+import os
+import re
+import sys
+import json
+import bisect
+import threading
+
+from packaging.requirements import Requirement, InvalidRequirement
+from packaging.utils import canonicalize_name
+from packaging.version import Version, InvalidVersion
+
+# Project presets live in presets.json (a list of {"name", "project_type",
+# "python_version", "requirements"} objects, shown in file order) and are
+# loaded once per process instead of being rebuilt on every rerun. The catalog
+# indexes presets by project type, Python version and required package, and
+# answers type-ahead searches through a sorted term list, so lookups stay fast
+# as the catalog grows. Requirements are parsed once as PEP 508 specifiers;
+# the reverse index from package to presets answers questions such as "which
+# presets pin pandas < 2.2" across the catalog (see PresetCatalog.find).
+PRESETS_PATH = os.environ.get("PRESETS_PATH",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "presets.json"))
+
+TERM_RE = re.compile(r"[a-z0-9]+(?:[._-][a-z0-9]+)*")
+COMMENT_RE = re.compile(r"(^|\s)#.*$")
+PIN_OPERATORS = ("==", "===")
+LOWEST_VERSION = Version("0.dev0")
+
+
+# The exclusive upper bound a spec implies without stating it: ~=2.2.0 and ==2.2.* stop at 2.3
+def _implied_upper_bound(spec):
+    if spec.operator == "~=":
+        release = Version(spec.version).release[:-1]
+    elif spec.operator in ("==", "!=") and spec.version.endswith(".*"):
+        release = Version(spec.version[:-2]).release
+    else:
+        return None
+    return Version(".".join(map(str, release[:-1] + (release[-1] + 1,))))
+
+
+# Versions to try when comparing specifier sets: the lowest version, every bound
+# (stated or implied) and a version just above each bound. Where one set allows
+# a version the other rules out, it allows one of these.
+def _boundary_versions(*specifiers):
+    yield LOWEST_VERSION
+    for specifier in specifiers:
+        for spec in specifier:
+            try:
+                bounds = [Version(spec.version[:-2] if spec.version.endswith(".*") else spec.version),
+                          _implied_upper_bound(spec)]
+            except InvalidVersion:
+                continue
+            for bound in bounds:
+                if bound is not None:
+                    yield bound
+                    yield Version(".".join(map(str, bound.release + (0, 0, 0, 0, 1))))
+
+
+# One requirement line of a preset, parsed
+class PresetRequirement:
+    __slots__ = ("preset", "line", "requirement", "package", "pinned")
+
+    def __init__(self, preset, line, requirement):
+        self.preset = preset
+        self.line = line
+        self.requirement = requirement
+        self.package = canonicalize_name(requirement.name)  # so Scikit_Learn and scikit-learn index together
+        self.pinned = None  # the exact version for == pins
+        for spec in requirement.specifier:
+            if spec.operator in PIN_OPERATORS and "*" not in spec.version:
+                self.pinned = spec.version
+
+    # Whether every version this requirement allows is in specifier: its pin, or its whole
+    # range (so pandas>=2.0 does not match pandas<2.2); anything matches a bare package name
+    def matches(self, specifier):
+        if not specifier:
+            return True
+        if self.pinned is not None:
+            return specifier.contains(self.pinned, prereleases=True)
+        own = self.requirement.specifier
+        return not any(own.contains(version, prereleases=True) and not specifier.contains(version, prereleases=True)
+                       for version in _boundary_versions(own, specifier))
+
+
+class Preset:
+    __slots__ = ("name", "project_type", "python_version", "requirements", "parsed", "invalid_lines")
+
+    def __init__(self, name, project_type, python_version, requirements):
+        self.name = name
+        self.project_type = project_type
+        self.python_version = python_version
+        self.requirements = requirements
+        self.parsed = []         # list[PresetRequirement]
+        self.invalid_lines = []  # lines that are neither PEP 508 requirements nor pip options
+        for line in requirements.splitlines():
+            line = COMMENT_RE.sub("", line).strip()
+            if not line or line.startswith("-"):
+                continue
+            try:
+                self.parsed.append(PresetRequirement(name, line, Requirement(line)))
+            except InvalidRequirement:
+                self.invalid_lines.append(line)
+
+    @property
+    def packages(self):
+        return [req.package for req in self.parsed]
+
+
+class PresetCatalog:
+    def __init__(self, presets):
+        self.presets = {}            # name -> Preset, in catalog order
+        self.by_project_type = {}    # project type -> preset names
+        self.by_python_version = {}  # python version -> preset names
+        self.by_package = {}         # normalized package name -> PresetRequirements, in catalog order
+        terms = set()
+        for preset in presets:
+            self.presets[preset.name] = preset
+            self.by_project_type.setdefault(preset.project_type, []).append(preset.name)
+            self.by_python_version.setdefault(preset.python_version, []).append(preset.name)
+            for req in preset.parsed:
+                self.by_package.setdefault(req.package, []).append(req)
+            text = " ".join([preset.name, preset.project_type, preset.python_version] + preset.packages)
+            for term in TERM_RE.findall(text.lower()):
+                terms.add((term, preset.name))
+                terms.update((part, preset.name) for part in re.split(r"[._-]", term))
+        self.names = list(self.presets)
+        self._order = {name: position for position, name in enumerate(self.names)}
+        self._terms = sorted(terms)  # (term, preset name) pairs for prefix lookups
+
+    def __len__(self):
+        return len(self.presets)
+
+    def __contains__(self, name):
+        return name in self.presets
+
+    def get(self, name):
+        return self.presets.get(name)
+
+    def _prefix_matches(self, prefix):
+        start = bisect.bisect_left(self._terms, (prefix,))
+        end = bisect.bisect_left(self._terms, (prefix + "\U0010ffff",))
+        return {name for _, name in self._terms[start:end]}
+
+    # Project types and Python versions to filter searches by, in catalog order
+    @property
+    def project_types(self):
+        return [project_type for project_type in self.by_project_type if project_type]
+
+    @property
+    def python_versions(self):
+        return [python_version for python_version in self.by_python_version if python_version]
+
+    # Names of presets where every word of text starts a term of their name, project type,
+    # Python version or packages, optionally only those of one project type and Python
+    # version, in catalog order
+    def search(self, text, limit=None, project_type=None, python_version=None):
+        matches = None
+        if project_type:
+            matches = set(self.by_project_type.get(project_type, ()))
+        if python_version:
+            names = set(self.by_python_version.get(python_version, ()))
+            matches = names if matches is None else matches & names
+        if matches is not None and not matches:
+            return []
+        for word in TERM_RE.findall(text.lower()):
+            names = self._prefix_matches(word)
+            matches = names if matches is None else matches & names
+            if not matches:
+                return []
+        if matches is None:
+            return self.names[:limit]
+        return sorted(matches, key=self._order.get)[:limit]
+
+    # Preset requirements matching a PEP 508 query such as "pandas<2.2" or "streamlit-ace"
+    def find(self, query):
+        requirement = Requirement(query)
+        return [req for req in self.by_package.get(canonicalize_name(requirement.name), [])
+                if req.matches(requirement.specifier)]
+
+
+def load_catalog(path=PRESETS_PATH):
+    with open(path, encoding="utf-8") as f:
+        items = json.load(f)
+    return PresetCatalog(Preset(item["name"], item.get("project_type", ""), item.get("python_version", ""),
+                                item.get("requirements", "")) for item in items)
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+# The catalog at path, loaded on first use and shared by every session in the process
+def get_catalog(path=PRESETS_PATH):
+    catalog = _catalogs.get(path)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(path)
+            if catalog is None:
+                catalog = _catalogs[path] = load_catalog(path)
+    return catalog
+
+
+# Command line queries for planning bulk upgrades:
+#   python preset_catalog.py "pandas<2.2"
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit('usage: python preset_catalog.py "<requirement>"')
+    try:
+        matches = get_catalog().find(sys.argv[1])
+    except InvalidRequirement as e:
+        sys.exit(f"Invalid requirement: {e}")
+    for req in matches:
+        print(f"{req.preset}: {req.line}")
+    print(f"{len({req.preset for req in matches})} presets")
@@ -0,0 +1,167 @@
+import sys
+import gzip
+import json
+from collections import Counter
+
+from project_store import open_project_store, blob_key, RequirementsEntry, PROJECT_DB_PATH
+
+# Project bundles move a whole project between servers. A bundle is gzipped
+# JSON Lines: a header, the listed versions, then every entry in save order.
+# Terminal and code texts are written once as blob lines that entries refer to
+# by key. Export streams entries out of the store and import adds them back one
+# line at a time, so memory stays flat however large the project is. Import
+# skips versions and entries the project already has, so importing a bundle
+# twice (or into the project it came from) adds nothing the second time.
+BUNDLE_FORMAT = "burst-project-bundle"
+BUNDLE_VERSION = 1
+BUNDLE_EXTENSION = ".jsonl.gz"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class BundleError(Exception):
+    pass
+
+
+# Fields each line type must have, with the types they may take
+LINE_FIELDS = {
+    "header": {"format": (str,), "version": (int,)},
+    "version": {"app_version": (str,), "interpreter": (str, type(None))},
+    "blob": {"key": (str,), "content": (str,)},
+    "terminal": {"app_version": (str,), "blob": (str,)},
+    "code": {"app_version": (str,), "blob": (str,)},
+    "requirements": {"app_version": (str,), "project_type": (str,), "python_version": (str,), "content": (str,)},
+    "note": {"app_version": (str,), "content": (str,)},
+}
+
+
+def check_line(line_number, line):
+    if not isinstance(line, dict):
+        raise BundleError(f"Line {line_number}: expected a JSON object")
+    fields = LINE_FIELDS.get(line.get("type"))
+    if fields is None:
+        raise BundleError(f"Line {line_number}: unknown line type {line.get('type')!r}")
+    for field, types in fields.items():
+        if not isinstance(line.get(field), types) or (types == (int,) and isinstance(line[field], bool)):
+            raise BundleError(f"Line {line_number}: missing or invalid {field!r}")
+
+
+# Identity of an entry for spotting ones the store already has; texts are hashed to keep it small
+def entry_signature(app_version, kind, value):
+    if kind in ("terminal", "code"):
+        return app_version, kind, value
+    if kind == "requirements":
+        value = json.dumps([value.project_type, value.python_version, value.content])
+    return app_version, kind, blob_key(value)
+
+
+def iter_bundle_lines(store):
+    yield {"type": "header", "format": BUNDLE_FORMAT, "version": BUNDLE_VERSION, "project": store.name}
+    for record in store:
+        yield {"type": "version", "app_version": record.app_version, "interpreter": record.interpreter}
+    written_blobs = set()
+    for app_version, kind, value in store.iter_entries():
+        if kind in ("terminal", "code"):
+            if value not in written_blobs:
+                yield {"type": "blob", "key": value, "content": store.get_blob(value)}
+                written_blobs.add(value)
+            yield {"type": kind, "app_version": app_version, "blob": value}
+        elif kind == "requirements":
+            yield {"type": kind, "app_version": app_version, "project_type": value.project_type,
+                   "python_version": value.python_version, "content": value.content}
+        else:
+            yield {"type": kind, "app_version": app_version, "content": value}
+
+
+# Write a bundle of the store to a binary file object; returns the number of lines written
+def write_bundle(store, fileobj):
+    count = 0
+    with gzip.GzipFile(fileobj=fileobj, mode="wb") as out:
+        for line in iter_bundle_lines(store):
+            out.write(json.dumps(line, ensure_ascii=False).encode("utf-8") + b"\n")
+            count += 1
+    return count
+
+
+def write_bundle_file(store, path):
+    with open(path, "wb") as f:
+        return write_bundle(store, f)
+
+
+# Add a bundle's contents to the store from a binary file object (gzipped or plain JSON Lines).
+# Entries the store already has are skipped, as many times as it has them. Returns counts of
+# what was imported per line type, plus "skipped" for versions and entries already present.
+def read_bundle(fileobj, store):
+    if fileobj.read(2) == GZIP_MAGIC:
+        fileobj.seek(0)
+        fileobj = gzip.GzipFile(fileobj=fileobj, mode="rb")
+    else:
+        fileobj.seek(0)
+    existing = Counter(entry_signature(*entry) for entry in store.iter_entries())
+    counts = {}
+    blob_keys = set()
+    for line_number, raw in enumerate(fileobj, 1):
+        if not raw.strip():
+            continue
+        try:
+            line = json.loads(raw)
+        except ValueError as e:
+            raise BundleError(f"Line {line_number} is not valid JSON: {e}") from e
+        if line_number == 1:
+            if not isinstance(line, dict) or line.get("type") != "header" or line.get("format") != BUNDLE_FORMAT:
+                raise BundleError("Not a project bundle")
+        check_line(line_number, line)
+        line_type = line["type"]
+        if line_type == "header":
+            if line_number != 1:
+                raise BundleError(f"Line {line_number}: unexpected header")
+            if line["version"] > BUNDLE_VERSION:
+                raise BundleError(f"Bundle version {line['version']} is newer than this app supports")
+        elif line_type == "version":
+            if not store.add_version(line["app_version"], line["interpreter"]):
+                line_type = "skipped"
+        elif line_type == "blob":
+            if store.put_blob(line["content"]) != line["key"]:
+                raise BundleError(f"Line {line_number}: blob content does not match its key")
+            blob_keys.add(line["key"])
+        else:
+            if line_type in ("terminal", "code"):
+                if line["blob"] not in blob_keys:
+                    raise BundleError(f"Line {line_number}: refers to a blob that is not in the bundle")
+                value = line["blob"]
+            elif line_type == "requirements":
+                value = RequirementsEntry(line["project_type"], line["python_version"], line["content"])
+            else:
+                value = line["content"]
+            signature = entry_signature(line["app_version"], line_type, value)
+            if existing[signature]:
+                existing[signature] -= 1
+                line_type = "skipped"
+            elif line_type in ("terminal", "code"):
+                store.add_blob_ref(line["app_version"], line_type, value)
+            elif line_type == "requirements":
+                store.add_requirements(line["app_version"], value.project_type, value.python_version, value.content)
+            else:
+                store.add_note(line["app_version"], value)
+        counts[line_type] = counts.get(line_type, 0) + 1
+    return counts
+
+
+def read_bundle_file(path, store):
+    with open(path, "rb") as f:
+        return read_bundle(f, store)
+
+
+# Command line use for projects too large for the browser uploader (SQLite backend):
+#   python project_bundle.py export <project> <bundle>
+#   python project_bundle.py import <project> <bundle>
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("export", "import"):
+        sys.exit("usage: python project_bundle.py export|import <project> <bundle>")
+    if not PROJECT_DB_PATH:
+        sys.exit("PROJECT_DB_PATH is not set; the command line works on the SQLite project database only")
+    command, project_name, bundle_path = sys.argv[1:]
+    project = open_project_store(project_name)
+    if command == "export":
+        print(f"Wrote {write_bundle_file(project, bundle_path)} lines to {bundle_path}")
+    else:
+        print(f"Imported {read_bundle_file(bundle_path, project)}")
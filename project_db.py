@@ -0,0 +1,323 @@
+import os
+import sqlite3
+import weakref
+import threading
+
+from project_store import (BaseProjectStore, RequirementsEntry, ConflictError, DEFAULT_PROJECT, ENTRY_KINDS,
+                           BLOB_KINDS, blob_key, SearchIndexSlot)
+from compressed_text import pack_text, unpack_text
+
+# SQLite backend for the project store. Saved items are written straight to
+# the database and read back only when a version's entries are displayed or
+# rendered, so a session holds nothing but the connection settings and
+# projects survive browser refreshes and server restarts. Terminal outputs and
+# code sections go to a content-addressed blob table, so repeated saves of the
+# same text add an entry row but store the text once; large blobs are stored
+# as zlib-compressed BLOBs.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    key TEXT PRIMARY KEY,
+    content NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL,
+    app_version TEXT NOT NULL,
+    interpreter TEXT,
+    UNIQUE (project, app_version)
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL,
+    app_version TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    project_type TEXT,
+    python_version TEXT,
+    content TEXT,
+    blob_key TEXT REFERENCES blobs (key),
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_by_version ON entries (project, app_version, kind, id);
+"""
+
+# Blob keys per query, well under SQLite's limit on bound parameters
+BLOB_QUERY_BATCH = 500
+# Idle connections kept per database for the next script threads
+MAX_IDLE_CONNECTIONS = int(os.environ.get("PROJECT_DB_IDLE_CONNECTIONS", 8))
+
+_connections = threading.local()
+_idle_connections = {}  # db path -> connections released by finished threads
+_ready_paths = set()    # databases whose schema is set up in this process
+_pool_lock = threading.Lock()
+# Search index slots by (database, project), shared by every session's store in this process.
+# Entries written by other processes are picked up when the server restarts.
+_search_slots = {}
+
+
+class _ThreadConnections:
+    def __init__(self):
+        self.by_path = {}
+        # Runs when the thread ends and its thread-local data is dropped
+        weakref.finalize(self, _release_connections, self.by_path)
+
+
+def _release_connections(by_path):
+    for db_path, conn in by_path.items():
+        if conn.in_transaction:
+            conn.rollback()
+        with _pool_lock:
+            idle = _idle_connections.setdefault(db_path, [])
+            if len(idle) < MAX_IDLE_CONNECTIONS:
+                idle.append(conn)
+                continue
+        conn.close()
+
+
+def _open_connection(db_path):
+    with _pool_lock:
+        idle = _idle_connections.get(db_path)
+        if idle:
+            return idle.pop()
+        if db_path not in _ready_paths:
+            directory = os.path.dirname(os.path.abspath(db_path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")  # persistent, so set once per database
+            conn.executescript(SCHEMA)
+            conn.close()
+            _ready_paths.add(db_path)
+    # Pooled connections move between threads, but only one thread uses each at a time
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# One connection per thread and database. Streamlit runs every rerun in a new
+# thread, so when a thread ends its connections go back to a small idle pool
+# for the next thread instead of being reopened each rerun.
+def get_connection(db_path):
+    local = getattr(_connections, "local", None)
+    if local is None:
+        local = _connections.local = _ThreadConnections()
+    conn = local.by_path.get(db_path)
+    if conn is None:
+        conn = local.by_path[db_path] = _open_connection(db_path)
+    return conn
+
+
+# A listed version whose entries are loaded from the database on first access
+class StoredVersionRecord:
+    __slots__ = ("_store", "_entries", "app_version", "interpreter")
+
+    def __init__(self, store, app_version, interpreter):
+        self._store = store
+        self._entries = None
+        self.app_version = app_version
+        self.interpreter = interpreter
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = self._store.load_entries(self.app_version)
+        return self._entries
+
+    @property
+    def notes(self):
+        return self._load()["notes"]
+
+    @property
+    def requirements(self):
+        return self._load()["requirements"]
+
+    @property
+    def terminal_keys(self):
+        return self._load()["terminal_keys"]
+
+    @property
+    def code_keys(self):
+        return self._load()["code_keys"]
+
+    # Blob texts are fetched only when asked for, all of a kind in one query
+    @property
+    def terminal_outputs(self):
+        blobs = self._store.get_blobs(self.terminal_keys)
+        return [blobs[key] for key in self.terminal_keys]
+
+    @property
+    def code_sections(self):
+        blobs = self._store.get_blobs(self.code_keys)
+        return [blobs[key] for key in self.code_keys]
+
+
+class SqliteProjectStore(BaseProjectStore):
+    def __init__(self, db_path, name=DEFAULT_PROJECT):
+        self.db_path = db_path
+        self.name = name
+
+    @property
+    def conn(self):
+        return get_connection(self.db_path)
+
+    @property
+    def search_slot(self):
+        slot = _search_slots.get((self.db_path, self.name))
+        if slot is None:
+            slot = _search_slots.setdefault((self.db_path, self.name), SearchIndexSlot())
+        return slot
+
+    def __contains__(self, app_version):
+        row = self.conn.execute("SELECT 1 FROM versions WHERE project = ? AND app_version = ?",
+                                (self.name, app_version)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM versions WHERE project = ?", (self.name,)).fetchone()[0]
+
+    # Listed version records in save order; entries stay on disk until accessed
+    def __iter__(self):
+        rows = self.conn.execute("SELECT app_version, interpreter FROM versions WHERE project = ? ORDER BY id",
+                                 (self.name,)).fetchall()
+        for app_version, interpreter in rows:
+            yield StoredVersionRecord(self, app_version, interpreter)
+
+    def get(self, app_version):
+        row = self.conn.execute("SELECT interpreter FROM versions WHERE project = ? AND app_version = ?",
+                                (self.name, app_version)).fetchone()
+        return StoredVersionRecord(self, app_version, row[0]) if row else None
+
+    def versions(self):
+        rows = self.conn.execute("SELECT app_version FROM versions WHERE project = ? ORDER BY id", (self.name,))
+        return [row[0] for row in rows]
+
+    # List a version; returns False if it was already listed
+    def add_version(self, app_version, interpreter=None):
+        if not app_version:
+            return False
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO versions (project, app_version, interpreter) VALUES (?, ?, ?)",
+                (self.name, app_version, interpreter))
+        return cursor.rowcount == 1
+
+    def _add_entry(self, app_version, kind, content, project_type=None, python_version=None):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO entries (project, app_version, kind, project_type, python_version, content) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.name, app_version, kind, project_type, python_version, content))
+
+    def _entry_count(self, app_version, kind):
+        return self.conn.execute("SELECT COUNT(*) FROM entries WHERE project = ? AND app_version = ? AND kind = ?",
+                                 (self.name, app_version, kind)).fetchone()[0]
+
+    # Store the text once under its hash
+    def put_blob(self, text):
+        key = blob_key(text)
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO blobs (key, content) VALUES (?, ?)", (key, pack_text(text)))
+        return key
+
+    def get_blob(self, key):
+        row = self.conn.execute("SELECT content FROM blobs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return unpack_text(row[0])
+
+    # Texts of several blobs by key, in as few queries as SQLite's parameter limit allows
+    def get_blobs(self, keys):
+        keys = list(dict.fromkeys(keys))
+        blobs = {}
+        for start in range(0, len(keys), BLOB_QUERY_BATCH):
+            batch = keys[start:start + BLOB_QUERY_BATCH]
+            rows = self.conn.execute(f"SELECT key, content FROM blobs WHERE key IN ({', '.join('?' * len(batch))})",
+                                     batch)
+            blobs.update((key, unpack_text(content)) for key, content in rows)
+        missing = [key for key in keys if key not in blobs]
+        if missing:
+            raise KeyError(missing[0])
+        return blobs
+
+    # Add a terminal or code entry for a blob that is already stored
+    def add_blob_ref(self, app_version, kind, key):
+        with self.conn:
+            self.conn.execute("INSERT INTO entries (project, app_version, kind, blob_key) VALUES (?, ?, ?, ?)",
+                              (self.name, app_version, kind, key))
+        self._index_added_entry(app_version, kind, key)
+        return key
+
+    # Every saved entry as (app version, kind, value) in save order, streamed from the database
+    def iter_entries(self):
+        rows = self.conn.execute(
+            "SELECT app_version, kind, project_type, python_version, content, blob_key FROM entries "
+            "WHERE project = ? ORDER BY id", (self.name,))
+        for app_version, kind, project_type, python_version, content, key in rows:
+            if kind in BLOB_KINDS:
+                yield app_version, kind, key
+            elif kind == "requirements":
+                yield app_version, kind, RequirementsEntry(project_type, python_version, content)
+            else:
+                yield app_version, kind, content
+
+    def add_note(self, app_version, text):
+        self._add_entry(app_version, "note", text)
+        self._index_added_entry(app_version, "note", text)
+
+    def add_requirements(self, app_version, project_type, python_version, content):
+        self._add_entry(app_version, "requirements", content, project_type, python_version)
+        entry = RequirementsEntry(project_type, python_version, content)
+        self._index_added_entry(app_version, "requirements", entry)
+        return entry
+
+    def add_terminal_output(self, app_version, output):
+        return self.add_blob_ref(app_version, "terminal", self.put_blob(output))
+
+    def add_code_section(self, app_version, code):
+        return self.add_blob_ref(app_version, "code", self.put_blob(code))
+
+    def _entry_row(self, app_version, kind, index):
+        return self.conn.execute(
+            "SELECT id, revision FROM entries WHERE project = ? AND app_version = ? AND kind = ? "
+            "ORDER BY id LIMIT 1 OFFSET ?",
+            (self.name, app_version, kind, index)).fetchone()
+
+    def entry_revision(self, app_version, kind, index):
+        row = self._entry_row(app_version, kind, index)
+        return row[1] if row else 0
+
+    # Replace an entry if it is still at expected_revision; returns the new revision.
+    # The revision check is part of the UPDATE, so concurrent writers cannot both win.
+    def update_entry(self, app_version, kind, index, value, expected_revision):
+        row = self._entry_row(app_version, kind, index)
+        if row is None:
+            raise IndexError(index)
+        entry_id = row[0]
+        with self.conn:
+            if kind in BLOB_KINDS:
+                key = blob_key(value)
+                self.conn.execute("INSERT OR IGNORE INTO blobs (key, content) VALUES (?, ?)", (key, pack_text(value)))
+                cursor = self.conn.execute(
+                    "UPDATE entries SET blob_key = ?, revision = revision + 1 WHERE id = ? AND revision = ?",
+                    (key, entry_id, expected_revision))
+            else:
+                cursor = self.conn.execute(
+                    "UPDATE entries SET content = ?, revision = revision + 1 WHERE id = ? AND revision = ?",
+                    (value, entry_id, expected_revision))
+        if cursor.rowcount != 1:
+            raise ConflictError(app_version, kind, index, expected_revision, self.entry_revision(app_version, kind, index))
+        self._index_entry(app_version, kind, index, key if kind in BLOB_KINDS else value)
+        return expected_revision + 1
+
+    # All entries of one version grouped into VersionRecord lists, plus their packed blobs
+    def load_entries(self, app_version):
+        entries = {field: [] for field in ENTRY_KINDS.values()}
+        rows = self.conn.execute(
+            "SELECT kind, project_type, python_version, content, blob_key FROM entries "
+            "WHERE project = ? AND app_version = ? ORDER BY id",
+            (self.name, app_version))
+        for kind, project_type, python_version, content, key in rows:
+            if kind in BLOB_KINDS:
+                entries[ENTRY_KINDS[kind]].append(key)
+            elif kind == "requirements":
+                entries["requirements"].append(RequirementsEntry(project_type, python_version, content))
+            else:
+                entries[ENTRY_KINDS[kind]].append(content)
+        return entries
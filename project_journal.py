@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import shutil
+import weakref
+import tempfile
+import threading
+
+from compressed_text import pack_text, unpack_text
+
+# Append-only history of a project's saves, edits and deletes. Every change is
+# one JSON line in the journal; every SNAPSHOT_EVERY events the current state
+# is compacted into a snapshot that records the journal offset it covers.
+# Startup loads the latest snapshot and replays only the tail, and the state
+# at any earlier event is rebuilt from the nearest older snapshot.
+JOURNAL_DIR = os.environ.get("PROJECT_JOURNAL_DIR",
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "journal"))
+SNAPSHOT_EVERY = 200
+PRIVATE_JOURNAL_DIR = os.path.join(JOURNAL_DIR, "sessions")
+
+# Session dicts making up a project's state, as used by vcstopdfv1-8.py;
+# terminal outputs and file contents are kept packed (see compressed_text)
+STATE_KEYS = ["task_list", "interpreter_dict", "text_dict", "terminal_dict", "file_dict", "ai_output_dict"]
+
+
+def empty_state():
+    return {key: ([] if key == "task_list" else {}) for key in STATE_KEYS}
+
+
+# Copy of a state that shares only the immutable texts, so it can be read while events are applied
+def copy_state(state):
+    copied = {}
+    for key in STATE_KEYS:
+        value = state[key]
+        if key == "task_list":
+            copied[key] = list(value)
+        elif key == "interpreter_dict":
+            copied[key] = dict(value)
+        else:
+            copied[key] = {app_version: items.copy() for app_version, items in value.items()}
+    return copied
+
+
+# Project names become directory names; reject anything that could leave the journal directory
+def check_project_name(name):
+    if name in ("", ".") or ".." in name or any(char in name for char in ("/", "\\", "\0")):
+        raise ValueError(f"Invalid project name: {name!r}")
+    return name
+
+
+# Apply one event to the state in place
+def apply_event(state, event):
+    op = event["op"]
+    app_version = event.get("app_version")
+    if op == "add_version":
+        if app_version not in state["task_list"]:
+            state["task_list"].append(app_version)
+            state["interpreter_dict"][app_version] = event["interpreter"]
+    elif op == "add_note":
+        state["text_dict"].setdefault(app_version, []).append(event["text"])
+    elif op == "add_terminal_output":
+        state["terminal_dict"].setdefault(app_version, []).append(pack_text(event["output"]))
+    elif op in ("save_file", "edit_file"):
+        state["file_dict"].setdefault(app_version, {})[event["file_name"]] = pack_text(event["content"])
+    elif op == "delete_file":
+        state["file_dict"].get(app_version, {}).pop(event["file_name"], None)
+    elif op == "clear_ai_outputs":
+        state["ai_output_dict"][app_version] = {}
+    elif op == "set_ai_output":
+        state["ai_output_dict"].setdefault(app_version, {})[event["file_name"]] = event["text"]
+    else:
+        raise ValueError(f"Unknown journal event: {op}")
+
+
+# Plain JSON form of the state for snapshots
+def _dump_state(state):
+    dumped = {}
+    for key in STATE_KEYS:
+        value = state[key]
+        if key == "terminal_dict":
+            value = {v: [unpack_text(item) for item in items] for v, items in value.items()}
+        elif key == "file_dict":
+            value = {v: {name: unpack_text(item) for name, item in files.items()} for v, files in value.items()}
+        dumped[key] = value
+    return dumped
+
+
+def _load_state(dumped):
+    state = empty_state()
+    for key in STATE_KEYS:
+        value = dumped.get(key, state[key])
+        if key == "terminal_dict":
+            value = {v: [pack_text(item) for item in items] for v, items in value.items()}
+        elif key == "file_dict":
+            value = {v: {name: pack_text(item) for name, item in files.items()} for v, files in value.items()}
+        state[key] = value
+    return state
+
+
+class ProjectJournal:
+    def __init__(self, name, directory=JOURNAL_DIR):
+        self.name = check_project_name(name)
+        self.directory = os.path.join(directory, name)
+        self.journal_path = os.path.join(self.directory, "journal.jsonl")
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock = threading.RLock()
+        self.state, self.seq = self._restore()
+        self.snapshot_seq = self._latest_snapshot_seq()
+
+    def _snapshot_path(self, seq):
+        return os.path.join(self.directory, f"snapshot-{seq:010d}.json")
+
+    def _snapshot_seqs(self):
+        seqs = []
+        for file_name in os.listdir(self.directory):
+            if file_name.startswith("snapshot-") and file_name.endswith(".json"):
+                seqs.append(int(file_name[len("snapshot-"):-len(".json")]))
+        return sorted(seqs)
+
+    def _latest_snapshot_seq(self, until=None):
+        seqs = [seq for seq in self._snapshot_seqs() if until is None or seq <= until]
+        return seqs[-1] if seqs else 0
+
+    # Load the newest snapshot at or before `until` and replay the journal after it
+    def _restore(self, until=None):
+        state, seq, offset = empty_state(), 0, 0
+        torn = False
+        snapshot_seq = self._latest_snapshot_seq(until)
+        if snapshot_seq:
+            with open(self._snapshot_path(snapshot_seq), encoding="utf-8") as f:
+                snapshot = json.load(f)
+            state, seq, offset = _load_state(snapshot["state"]), snapshot["seq"], snapshot["offset"]
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    try:
+                        event = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        event = None
+                    if event is None:
+                        torn = True
+                        break
+                    if until is not None and event["seq"] > until:
+                        break
+                    apply_event(state, event)
+                    seq = event["seq"]
+                    offset += len(line)
+        # A torn final line from an interrupted write; drop it so appends stay readable
+        if torn and until is None:
+            os.truncate(self.journal_path, offset)
+        return state, seq
+
+    # Append an event and apply it; returns the event's sequence number
+    def record(self, op, **fields):
+        with self.lock:
+            event = {"seq": self.seq + 1, "ts": time.time(), "op": op, **fields}
+            apply_event(self.state, event)
+            with open(self.journal_path, "ab") as f:
+                f.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.seq = event["seq"]
+            if self.seq - self.snapshot_seq >= SNAPSHOT_EVERY:
+                self.compact()
+            return self.seq
+
+    # Copy of the current state, taken under the lock
+    def read_state(self):
+        with self.lock:
+            return copy_state(self.state)
+
+    # Write a snapshot of the current state covering the journal up to its current end
+    def compact(self):
+        offset = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+        snapshot = {"seq": self.seq, "offset": offset, "state": _dump_state(self.state)}
+        fd, tmp_path = tempfile.mkstemp(suffix=".part", dir=self.directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self._snapshot_path(self.seq))
+        self.snapshot_seq = self.seq
+
+    # State as of event `seq`
+    def state_at(self, seq):
+        return self._restore(until=seq)[0]
+
+    # Sequence number of the last event recorded at or before a timestamp
+    def seq_at_time(self, timestamp):
+        seq = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break
+                    if event["ts"] > timestamp:
+                        break
+                    seq = event["seq"]
+        return seq
+
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+# One journal per project and process, shared by every session working on it
+def open_journal(name):
+    check_project_name(name)
+    with _journals_lock:
+        journal = _journals.get(name)
+        if journal is None:
+            journal = _journals[name] = ProjectJournal(name)
+        return journal
+
+
+# A journal for one session only, as session state was before journals; it is
+# deleted when the session ends and the journal is garbage collected
+def open_private_journal(session_id):
+    journal = ProjectJournal(session_id, PRIVATE_JOURNAL_DIR)
+    weakref.finalize(journal, shutil.rmtree, journal.directory, True)
+    return journal
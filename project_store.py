@@ -0,0 +1,305 @@
+import os
+import hashlib
+import threading
+
+from compressed_text import pack_text, unpack_text
+from search_index import SearchIndex
+
+# One store per project instead of parallel task_list / *_dict structures in
+# st.session_state. Every app version has a single slots-based record; listed
+# versions are kept in an insertion-ordered dict so membership is O(1).
+DEFAULT_PROJECT = "default"
+
+# Set to a file path (e.g. ./data/projects.db) to keep projects in SQLite instead of session memory
+PROJECT_DB_PATH = os.environ.get("PROJECT_DB_PATH", "")
+
+# Entry kinds and the VersionRecord lists they fill; blob kinds list blob keys
+ENTRY_KINDS = {"note": "notes", "requirements": "requirements", "terminal": "terminal_keys", "code": "code_keys"}
+BLOB_KINDS = ("terminal", "code")
+# Entry kinds that can be edited after saving, with the record lists holding their text
+EDITABLE_KINDS = {"note": "notes", "terminal": "terminal_outputs", "code": "code_sections"}
+
+
+# Raised when an entry was changed by someone else since it was read
+class ConflictError(Exception):
+    def __init__(self, app_version, kind, index, expected_revision, revision):
+        super().__init__(f"{kind} entry {index + 1} of {app_version} is at revision {revision}, "
+                         f"not {expected_revision}")
+        self.app_version = app_version
+        self.kind = kind
+        self.index = index
+        self.revision = revision
+
+
+class RequirementsEntry:
+    __slots__ = ("project_type", "python_version", "content")
+
+    def __init__(self, project_type, python_version, content):
+        self.project_type = project_type
+        self.python_version = python_version
+        self.content = content
+
+    def to_dict(self):
+        return {"project_type": self.project_type, "python_version": self.python_version, "content": self.content}
+
+
+# Terminal outputs and code sections are large and often saved repeatedly, so
+# their text is stored once per content hash, compressed, and entries hold the hash
+def blob_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    __slots__ = ("blobs",)
+
+    def __init__(self):
+        self.blobs = {}  # content hash -> packed text (see compressed_text)
+
+    def __len__(self):
+        return len(self.blobs)
+
+    def put(self, text):
+        key = blob_key(text)
+        if key not in self.blobs:
+            self.blobs[key] = pack_text(text)
+        return key
+
+    def get(self, key):
+        return unpack_text(self.blobs[key])
+
+
+class VersionRecord:
+    __slots__ = ("app_version", "interpreter", "notes", "requirements", "terminal_keys", "code_keys", "_blobs")
+
+    def __init__(self, app_version, blobs):
+        self.app_version = app_version
+        self.interpreter = None
+        self.notes = []          # list[str]
+        self.requirements = []   # list[RequirementsEntry]
+        self.terminal_keys = []  # list of blob keys
+        self.code_keys = []      # list of blob keys
+        self._blobs = blobs
+
+    @property
+    def terminal_outputs(self):
+        return [self._blobs.get(key) for key in self.terminal_keys]
+
+    @property
+    def code_sections(self):
+        return [self._blobs.get(key) for key in self.code_keys]
+
+
+# A store's search index and the lock guarding it. The lock is held only to
+# read or publish the index: builds run outside it and the first to finish is
+# published, after catching up on the entries saved while it ran.
+class SearchIndexSlot:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index = None
+        self.backlog = None  # (app version, kind, position, value) saved during a build
+
+
+# Report snapshot, AI context and search shared by the in-memory and SQLite
+# stores; subclasses iterate listed records in save order and report each
+# added or edited entry to the search index
+class BaseProjectStore:
+    shared = False
+    search_slot = None  # SearchIndexSlot, set by subclasses
+
+    # Report snapshot in the shape pdf_report expects, for listed versions only
+    def snapshot(self):
+        snapshot = {"task_list": [], "interpreter_dict": {}, "requirements_dict": {},
+                    "text_dict": {}, "terminal_dict": {}, "code_dict": {}}
+        for record in self:
+            app_version = record.app_version
+            snapshot["task_list"].append(app_version)
+            snapshot["interpreter_dict"][app_version] = record.interpreter
+            if record.requirements:
+                snapshot["requirements_dict"][app_version] = [r.to_dict() for r in record.requirements]
+            if record.notes:
+                snapshot["text_dict"][app_version] = list(record.notes)
+            if record.terminal_keys:
+                snapshot["terminal_dict"][app_version] = record.terminal_outputs
+            if record.code_keys:
+                snapshot["code_dict"][app_version] = record.code_sections
+        return snapshot
+
+    # Saved items keyed by version, as used for AI context
+    def to_context(self):
+        context = {}
+        for record in self:
+            version_data = {}
+            if record.interpreter is not None:
+                version_data["interpreter_version"] = record.interpreter
+            if record.requirements:
+                version_data["requirements"] = [r.to_dict() for r in record.requirements]
+            if record.notes:
+                version_data["notes"] = record.notes
+            if record.terminal_keys:
+                version_data["terminal_outputs"] = record.terminal_outputs
+            if record.code_keys:
+                version_data["code_sections"] = record.code_sections
+            context[record.app_version] = version_data
+        return context
+
+    # The text an entry is searched by, and the ref the index fetches it again with
+    def _search_doc(self, kind, value):
+        if kind in BLOB_KINDS:
+            return self.get_blob(value), ("blob", value)
+        text = f"{value.project_type}\n{value.content}" if kind == "requirements" else value
+        return text, ("text", text)
+
+    def _search_text(self, ref):
+        source, value = ref
+        return self.get_blob(value) if source == "blob" else value
+
+    # Built from the saved entries on first use, then kept current by every save and edit
+    @property
+    def search_index(self):
+        slot = self.search_slot
+        with slot.lock:
+            if slot.index is not None:
+                return slot.index
+            if slot.backlog is None:
+                slot.backlog = []
+        index = SearchIndex(self._search_text)
+        positions = {}
+        for app_version, kind, value in self.iter_entries():
+            position = positions.get((app_version, kind), 0)
+            positions[(app_version, kind)] = position + 1
+            index.add(app_version, kind, position, *self._search_doc(kind, value))
+        with slot.lock:
+            if slot.index is None:
+                for app_version, kind, position, value in slot.backlog:
+                    index.add(app_version, kind, position, *self._search_doc(kind, value))
+                slot.index, slot.backlog = index, None
+            return slot.index
+
+    def _index_entry(self, app_version, kind, position, value):
+        slot = self.search_slot
+        with slot.lock:
+            index = slot.index
+            if index is None:
+                if slot.backlog is not None:
+                    slot.backlog.append((app_version, kind, position, value))
+                return
+        index.add(app_version, kind, position, *self._search_doc(kind, value))
+
+    # Index the entry just appended to a version's list of this kind
+    def _index_added_entry(self, app_version, kind, value):
+        slot = self.search_slot
+        if slot.index is not None or slot.backlog is not None:
+            self._index_entry(app_version, kind, self._entry_count(app_version, kind) - 1, value)
+
+    # Ranked SearchResults for a query (see search_index), optionally limited to some versions and kinds
+    def search(self, query, versions=None, kinds=None, limit=20):
+        return self.search_index.search(query, versions, kinds, limit)
+
+
+class ProjectStore(BaseProjectStore):
+    def __init__(self, name=DEFAULT_PROJECT):
+        self.name = name
+        self.records = {}  # app version -> VersionRecord, including versions not listed yet
+        self.index = {}    # listed app versions in the order they were saved
+        self.blobs = BlobStore()
+        self.revisions = {}  # (app version, kind, position) -> revision, for entries edited after saving
+        self.search_slot = SearchIndexSlot()
+
+    def __contains__(self, app_version):
+        return app_version in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    # Listed version records in save order; iterates a copy so other sessions can keep listing versions
+    def __iter__(self):
+        for app_version in list(self.index):
+            yield self.records[app_version]
+
+    def get(self, app_version):
+        return self.records[app_version] if app_version in self.index else None
+
+    def versions(self):
+        return list(self.index)
+
+    # Items can be saved before their version is listed, as with the old dicts
+    def record(self, app_version):
+        record = self.records.get(app_version)
+        if record is None:
+            record = VersionRecord(app_version, self.blobs)
+            self.records[app_version] = record
+        return record
+
+    # List a version; returns False if it was already listed
+    def add_version(self, app_version, interpreter=None):
+        if not app_version or app_version in self.index:
+            return False
+        record = self.record(app_version)
+        record.interpreter = interpreter
+        self.index[app_version] = None
+        return True
+
+    def add_note(self, app_version, text):
+        self.record(app_version).notes.append(text)
+        self._index_added_entry(app_version, "note", text)
+
+    def add_requirements(self, app_version, project_type, python_version, content):
+        entry = RequirementsEntry(project_type, python_version, content)
+        self.record(app_version).requirements.append(entry)
+        self._index_added_entry(app_version, "requirements", entry)
+        return entry
+
+    # Returns the blob key; saving the same output twice stores its text once
+    def add_terminal_output(self, app_version, output):
+        return self.add_blob_ref(app_version, "terminal", self.put_blob(output))
+
+    def add_code_section(self, app_version, code):
+        return self.add_blob_ref(app_version, "code", self.put_blob(code))
+
+    def put_blob(self, text):
+        return self.blobs.put(text)
+
+    def get_blob(self, key):
+        return self.blobs.get(key)
+
+    # Add a terminal or code entry for a blob that is already stored
+    def add_blob_ref(self, app_version, kind, key):
+        getattr(self.record(app_version), ENTRY_KINDS[kind]).append(key)
+        self._index_added_entry(app_version, kind, key)
+        return key
+
+    def _entry_count(self, app_version, kind):
+        return len(getattr(self.record(app_version), ENTRY_KINDS[kind]))
+
+    # Every saved entry as (app version, kind, value), versions listed or not; blob kinds yield their key
+    def iter_entries(self):
+        for record in list(self.records.values()):
+            for kind, field in ENTRY_KINDS.items():
+                for value in list(getattr(record, field)):
+                    yield record.app_version, kind, value
+
+    def entry_revision(self, app_version, kind, index):
+        return self.revisions.get((app_version, kind, index), 0)
+
+    # Replace an entry if it is still at expected_revision; returns the new revision
+    def update_entry(self, app_version, kind, index, value, expected_revision):
+        revision = self.entry_revision(app_version, kind, index)
+        if revision != expected_revision:
+            raise ConflictError(app_version, kind, index, expected_revision, revision)
+        items = getattr(self.record(app_version), ENTRY_KINDS[kind])
+        items[index] = self.blobs.put(value) if kind in BLOB_KINDS else value
+        self.revisions[(app_version, kind, index)] = revision + 1
+        self._index_entry(app_version, kind, index, items[index])
+        return revision + 1
+
+
+# Open the store for a project, in SQLite when PROJECT_DB_PATH is set. A shared
+# store is the project's workspace as seen by one session (see shared_workspace).
+def open_project_store(name=DEFAULT_PROJECT, shared=False, session_id=None):
+    if shared:
+        from shared_workspace import open_workspace
+        return open_workspace(name).session(session_id)
+    if PROJECT_DB_PATH:
+        from project_db import SqliteProjectStore
+        return SqliteProjectStore(PROJECT_DB_PATH, name)
+    return ProjectStore(name)
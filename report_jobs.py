@@ -0,0 +1,326 @@
+import os
+import time
+import uuid
+import shutil
+import weakref
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from pdf_download import spool_pdf_file, publish_pdf_file
+from pdf_report import build_report_pdf, version_snapshot
+from pdf_fast_text import build_fast_text_pdf
+from pdf_themes import DEFAULT_THEME
+from pdf_cache import section_key, get_cached_section, store_section
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # parallel mode falls back to a single build without pypdf
+    PdfWriter = None
+
+# Number of worker processes shared by every session on this server
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+# Minimum seconds between progress updates sent back from a worker
+PROGRESS_INTERVAL = 0.25
+
+# Report layouts selectable per job
+REPORT_BUILDERS = {"standard": build_report_pdf, "fast_text": build_fast_text_pdf}
+
+_runtime = {}
+_runtime_lock = threading.Lock()
+
+
+class ReportJobCancelled(Exception):
+    pass
+
+
+def _job_status(state, done=0, total=0, path=None, error=None):
+    return {"state": state, "done": done, "total": total, "path": path, "error": error}
+
+
+# Create the process pool and the shared status table once per process
+def get_job_runtime():
+    if not _runtime:
+        with _runtime_lock:
+            if not _runtime:
+                context = multiprocessing.get_context("spawn")
+                manager = context.Manager()
+                _runtime.update(
+                    executor=ProcessPoolExecutor(max_workers=REPORT_WORKERS, mp_context=context),
+                    status=manager.dict(),
+                    cancelled=manager.dict(),
+                    futures={},
+                    forgotten=set(),  # parallel jobs to drop once their parts finish
+                    lock=threading.Lock(),
+                    manager=manager,
+                )
+    return _runtime
+
+
+# Runs inside a worker process: render a snapshot into a spooled file, reporting progress under status_key
+def _build_with_progress(job_id, status_key, snapshot, mode, theme_name, status, cancelled):
+    state = {"done": 0, "total": 0, "last_update": 0.0}
+
+    def on_start(total):
+        state["total"] = total
+        status[status_key] = _job_status("running", 0, total)
+
+    # Called once per element the builder counted in on_start, never for split pieces
+    def on_flowable(flowable):
+        state["done"] = min(state["done"] + 1, state["total"])
+        now = time.monotonic()
+        if now - state["last_update"] < PROGRESS_INTERVAL:
+            return
+        state["last_update"] = now
+        if job_id in cancelled:
+            raise ReportJobCancelled()
+        status[status_key] = _job_status("running", state["done"], state["total"])
+
+    pdf_path = spool_pdf_file()
+    try:
+        REPORT_BUILDERS[mode](snapshot, pdf_path, on_flowable=on_flowable, on_start=on_start, theme_name=theme_name)
+    except ReportJobCancelled:
+        os.remove(pdf_path)
+        status[status_key] = _job_status("cancelled", state["done"], state["total"])
+        return None
+    except Exception as e:
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+        status[status_key] = _job_status("failed", state["done"], state["total"], error=str(e))
+        return None
+    status[status_key] = _job_status("built", state["total"], state["total"], path=pdf_path)
+    return pdf_path
+
+
+# Builds are reproducible, so identical snapshots and layouts share one cache key;
+# build is "single" or "merged", as merged reports differ from single builds (outline, page numbers)
+def _layout_key(mode, theme_name, build="single"):
+    return f"{mode}/{theme_name}/{build}"
+
+
+# Runs inside a worker process: publish a copy of a report that is already cached
+def _publish_cached_report(job_id, cached_path, status):
+    pdf_path = spool_pdf_file()
+    shutil.copyfile(cached_path, pdf_path)
+    pdf_path = publish_pdf_file(pdf_path)
+    status[job_id] = _job_status("done", path=pdf_path)
+    return pdf_path
+
+
+# Runs inside a worker process
+def _run_report_job(job_id, snapshot, mode, theme_name, report_key, status, cancelled):
+    pdf_path = _build_with_progress(job_id, job_id, snapshot, mode, theme_name, status, cancelled)
+    if pdf_path is None:
+        return None
+    store_section(report_key, pdf_path, copy=True)
+    pdf_path = publish_pdf_file(pdf_path)
+    total = status[job_id]["total"]
+    status[job_id] = _job_status("done", total, total, path=pdf_path)
+    return pdf_path
+
+
+# Runs inside a worker process: render one app version of a parallel job into the section cache
+def _run_report_part(job_id, index, snapshot, mode, theme_name, cache_key, status, cancelled):
+    part_path = _build_with_progress(job_id, f"{job_id}/{index}", snapshot, mode, theme_name, status, cancelled)
+    if part_path is None:
+        return None
+    return store_section(cache_key, part_path)
+
+
+# Runs inside a worker process: concatenate the per-version parts in order
+def _merge_report_parts(job_id, versions, part_paths, report_key, status):
+    total = status[job_id]["total"]
+    status[job_id] = _job_status("merging", total, total)
+    writer = PdfWriter()
+    for app_version, part_path in zip(versions, part_paths):
+        writer.append(part_path, outline_item=f"App Version: {app_version}")
+    pdf_path = spool_pdf_file()
+    with open(pdf_path, "wb") as f:
+        writer.write(f)
+    writer.close()
+    store_section(report_key, pdf_path, copy=True)
+    pdf_path = publish_pdf_file(pdf_path)
+    status[job_id] = _job_status("done", total, total, path=pdf_path)
+    return pdf_path
+
+
+# Queue a report build for a saved-items snapshot and return its job id
+def submit_report_job(snapshot, mode="standard", theme_name=DEFAULT_THEME):
+    runtime = get_job_runtime()
+    job_id = uuid.uuid4().hex
+    runtime["status"][job_id] = _job_status("queued")
+    report_key = section_key(snapshot, _layout_key(mode, theme_name))
+    cached_path = get_cached_section(report_key)
+    if cached_path is not None:
+        runtime["futures"][job_id] = runtime["executor"].submit(
+            _publish_cached_report, job_id, cached_path, runtime["status"]
+        )
+        return job_id
+    runtime["futures"][job_id] = runtime["executor"].submit(
+        _run_report_job, job_id, snapshot, mode, theme_name, report_key, runtime["status"], runtime["cancelled"]
+    )
+    return job_id
+
+
+# Queue one build per dirty app version and merge them with the cached sections of the rest
+def submit_parallel_report_job(snapshot, mode="standard", theme_name=DEFAULT_THEME):
+    versions = list(snapshot["task_list"])
+    if PdfWriter is None or not versions:
+        return submit_report_job(snapshot, mode, theme_name)
+
+    runtime = get_job_runtime()
+    job_id = uuid.uuid4().hex
+    status = runtime["status"]
+    status[job_id] = _job_status("queued", 0, 0)
+    report_key = section_key(snapshot, _layout_key(mode, theme_name, "merged"))
+    cached_path = get_cached_section(report_key)
+    if cached_path is not None:
+        runtime["futures"][job_id] = runtime["executor"].submit(_publish_cached_report, job_id, cached_path, status)
+        return job_id
+    status[f"{job_id}/parts"] = len(versions)
+
+    part_paths = [None] * len(versions)
+    part_futures = {}
+    for index, app_version in enumerate(versions):
+        narrowed = version_snapshot(snapshot, app_version)
+        cache_key = section_key(narrowed, _layout_key(mode, theme_name))
+        cached_path = get_cached_section(cache_key)
+        if cached_path is not None:
+            part_paths[index] = cached_path
+            status[f"{job_id}/{index}"] = _job_status("cached", path=cached_path)
+            continue
+        part_futures[index] = runtime["executor"].submit(
+            _run_report_part, job_id, index, narrowed, mode, theme_name, cache_key, status, runtime["cancelled"]
+        )
+    pending = {"count": len(part_futures)}
+
+    def submit_merge():
+        aggregated = get_report_job_status(job_id)
+        status[job_id] = _job_status("running", aggregated["done"], aggregated["total"])
+        runtime["futures"][job_id] = runtime["executor"].submit(
+            _merge_report_parts, job_id, versions, part_paths, report_key, status
+        )
+
+    # Called from the executor's management thread as each part completes; the last one
+    # settles the job under the lock, so forget_report_job sees either the parts or the outcome
+    def on_part_done(future):
+        with runtime["lock"]:
+            pending["count"] -= 1
+            if pending["count"]:
+                return
+            for index, f in part_futures.items():
+                part_paths[index] = f.result() if not f.cancelled() and f.exception() is None else None
+            if job_id in runtime["forgotten"]:
+                runtime["forgotten"].discard(job_id)
+                _drop_report_job(job_id)
+                return
+            if all(part_paths) and job_id not in runtime["cancelled"]:
+                submit_merge()
+                return
+            runtime["futures"].pop(job_id, None)
+            aggregated = get_report_job_status(job_id)
+            if job_id in runtime["cancelled"]:
+                status[job_id] = _job_status("cancelled", aggregated["done"], aggregated["total"])
+            else:
+                errors = [status.get(f"{job_id}/{index}", {}).get("error") for index in range(len(versions))]
+                error = next((e for e in errors if e), "a version failed to render")
+                status[job_id] = _job_status("failed", aggregated["done"], aggregated["total"], error=error)
+
+    if not part_futures:
+        submit_merge()
+        return job_id
+    runtime["futures"][job_id] = list(part_futures.values())
+    for future in part_futures.values():
+        future.add_done_callback(on_part_done)
+    return job_id
+
+
+def get_report_job_status(job_id):
+    runtime = get_job_runtime()
+    status = runtime["status"].get(job_id)
+    if status is None:
+        return _job_status("unknown")
+    status = dict(status)
+
+    # Parallel jobs report the sum of their parts until the merge starts
+    parts = runtime["status"].get(f"{job_id}/parts")
+    if parts and status["state"] in ("queued", "running"):
+        part_statuses = [runtime["status"].get(f"{job_id}/{index}") for index in range(parts)]
+        started = [p for p in part_statuses if p]
+        if started:
+            status["state"] = "running"
+            status["done"] = sum(p["done"] for p in started)
+            status["total"] = sum(p["total"] for p in started)
+
+    future = runtime["futures"].get(job_id)
+    if future is not None and not isinstance(future, list) and future.done():
+        runtime["futures"].pop(job_id, None)
+        error = None if future.cancelled() else future.exception()
+        if error is not None and status["state"] not in ("done", "failed", "cancelled"):
+            status = _job_status("failed", status["done"], status["total"], error=str(error))
+            runtime["status"][job_id] = status
+    return status
+
+
+# Cancel queued work outright, or ask running workers to stop at their next flowable
+def cancel_report_job(job_id):
+    runtime = get_job_runtime()
+    runtime["cancelled"][job_id] = True
+    futures = runtime["futures"].get(job_id)
+    if futures is None:
+        return
+    if not isinstance(futures, list):
+        if futures.cancel():
+            runtime["futures"].pop(job_id, None)
+            runtime["status"][job_id] = _job_status("cancelled")
+        return
+    for future in futures:
+        future.cancel()
+
+
+# Drop bookkeeping for a job the session no longer tracks. A job whose workers are
+# still running keeps its cancelled flag and status until they finish, so they
+# still see a cancel and their last status writes are dropped along with the rest.
+def forget_report_job(job_id):
+    runtime = get_job_runtime()
+    with runtime["lock"]:
+        futures = runtime["futures"].get(job_id)
+        if isinstance(futures, list):  # parts still running; the last one drops the job
+            runtime["forgotten"].add(job_id)
+            return
+    if futures is not None and not futures.done():
+        futures.add_done_callback(lambda future: _drop_report_job(job_id))
+        return
+    _drop_report_job(job_id)
+
+
+def _drop_report_job(job_id):
+    runtime = get_job_runtime()
+    parts = runtime["status"].pop(f"{job_id}/parts", 0)
+    for index in range(parts):
+        runtime["status"].pop(f"{job_id}/{index}", None)
+    runtime["status"].pop(job_id, None)
+    runtime["cancelled"].pop(job_id, None)
+    runtime["futures"].pop(job_id, None)
+
+
+def _forget_jobs(job_ids):
+    for job_id in list(job_ids):
+        cancel_report_job(job_id)
+        forget_report_job(job_id)
+
+
+# The report jobs of one session, kept in its session state; jobs it still tracks are
+# cancelled and forgotten when it is dropped (replaced, or garbage collected with the session)
+class SessionReportJobs:
+    def __init__(self):
+        self.job_ids = set()
+        weakref.finalize(self, _forget_jobs, self.job_ids)
+
+    def add(self, job_id):
+        self.job_ids.add(job_id)
+        return job_id
+
+    def drop(self, job_id):
+        self.job_ids.discard(job_id)
+        _forget_jobs([job_id])
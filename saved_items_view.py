@@ -0,0 +1,46 @@
+import streamlit as st
+
+# Saved items are shown a page of versions at a time, and each version's
+# sections stay collapsed until toggled open. Unlike st.expander, whose
+# contents are sent to the browser even while collapsed, a closed toggle sends
+# nothing, so a rerun only renders what is on screen whatever the project size.
+# Long texts are cut to a preview that grows with "Load more".
+ALL_VERSIONS = "All versions"
+PAGE_SIZES = [5, 10, 25, 50]
+PREVIEW_CHARS = 5000
+LOAD_MORE_CHARS = 50000
+
+
+# Version picker and pager; returns the app versions to render this run
+def pick_versions(versions, key):
+    col1, col2, col3 = st.columns(3)
+    picked = col1.selectbox("Show:", [ALL_VERSIONS] + list(versions), key=f"{key}-picked")
+    if picked != ALL_VERSIONS:
+        return [picked]
+    page_size = col2.selectbox("Versions per page:", PAGE_SIZES, key=f"{key}-page-size")
+    pages = max(1, -(-len(versions) // page_size))
+    # Keep the stored page in range when the page size grows or versions are removed
+    if st.session_state.get(f"{key}-page", 1) > pages:
+        st.session_state[f"{key}-page"] = pages
+    page = col3.number_input(f"Page (of {pages}):", min_value=1, max_value=pages, step=1, key=f"{key}-page")
+    start = (page - 1) * page_size
+    return list(versions[start:start + page_size])
+
+
+# A collapsible section whose contents are only rendered while it is open
+def section_open(label, count, key):
+    return st.toggle(f"{label} ({count})", key=key)
+
+
+def _load_more(limit_key, limit):
+    st.session_state[limit_key] = limit + LOAD_MORE_CHARS
+
+
+# Show the start of a long text with a "Load more" button; fetch(n) returns its first n characters
+def show_long_text(fetch, language, key):
+    limit_key = f"{key}-limit"
+    limit = st.session_state.get(limit_key, PREVIEW_CHARS)
+    text = fetch(limit + 1)
+    st.code(text[:limit], language=language)
+    if len(text) > limit:
+        st.button("Load more", key=f"{key}-more", on_click=_load_more, args=(limit_key, limit))
@@ -0,0 +1,193 @@
+import re
+import math
+import heapq
+import bisect
+import threading
+from collections import Counter
+
+# Full-text search over a project's saved entries. The index maps each token
+# to the entries containing it and how often (an inverted index), and is kept
+# up to date by the store on every save and edit instead of being rebuilt.
+# Entries are identified by (app version, kind, position), the same triple
+# update_entry takes. Queries are words, "quoted phrases" and prefix* terms;
+# every term must match, and results are ranked by BM25. Phrases are checked
+# against the entry text only for the best-scoring candidates, so a query reads
+# just the few texts it returns.
+BM25_K1 = 1.2
+BM25_B = 0.75
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 64  # a prefix matches at most this many tokens, the most common first
+
+WORD_RE = re.compile(r"\w+")
+IDENTIFIER_PART_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def word_tokens(text):
+    return WORD_RE.findall(text.lower())
+
+
+# Identifiers also match on their snake_case and camelCase parts
+def code_tokens(text):
+    tokens = []
+    for word in WORD_RE.findall(text):
+        tokens.append(word.lower())
+        parts = [part.lower() for piece in word.split("_") for part in IDENTIFIER_PART_RE.findall(piece)]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+TOKENIZERS = {"note": word_tokens, "terminal": word_tokens, "code": code_tokens, "requirements": word_tokens}
+
+
+class SearchResult:
+    __slots__ = ("app_version", "kind", "position", "score", "snippet")
+
+    def __init__(self, app_version, kind, position, score, snippet):
+        self.app_version = app_version
+        self.kind = kind
+        self.position = position
+        self.score = score
+        self.snippet = snippet
+
+
+class SearchIndex:
+    # load_text(ref) returns the text of an entry from the ref it was indexed with
+    def __init__(self, load_text):
+        self.load_text = load_text
+        self._lock = threading.RLock()
+        self.postings = {}       # token -> {doc: term frequency}
+        self.docs = {}           # doc -> (token count, ref)
+        self.total_length = 0
+        self._vocabulary = None  # sorted tokens for prefix queries, rebuilt after the vocabulary grows
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _tokens(self, kind, text):
+        return TOKENIZERS.get(kind, word_tokens)(text)
+
+    # Index or re-index an entry; ref is whatever load_text needs to fetch its text again
+    def add(self, app_version, kind, position, text, ref):
+        doc = (app_version, kind, position)
+        tokens = self._tokens(kind, text)
+        counts = Counter(tokens)
+        with self._lock:
+            self.remove(app_version, kind, position)
+            for token, count in counts.items():
+                docs = self.postings.get(token)
+                if docs is None:
+                    docs = self.postings[token] = {}
+                    self._vocabulary = None
+                docs[doc] = count
+            self.docs[doc] = (len(tokens), ref)
+            self.total_length += len(tokens)
+
+    def remove(self, app_version, kind, position):
+        doc = (app_version, kind, position)
+        with self._lock:
+            if doc not in self.docs:
+                return
+            length, ref = self.docs.pop(doc)
+            self.total_length -= length
+            for token in set(self._tokens(kind, self.load_text(ref))):
+                docs = self.postings.get(token)
+                if docs is not None:
+                    docs.pop(doc, None)
+                    if not docs:
+                        del self.postings[token]
+                        self._vocabulary = None
+
+    def _expand_prefix(self, prefix):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\U0010ffff")
+        tokens = self._vocabulary[start:end]
+        if len(tokens) > MAX_PREFIX_EXPANSIONS:
+            tokens = heapq.nlargest(MAX_PREFIX_EXPANSIONS, tokens, key=lambda token: len(self.postings[token]))
+        return tokens
+
+    # Docs matching one query term with their BM25 weight for it
+    def _term_scores(self, tokens):
+        scores = {}
+        doc_count = len(self.docs)
+        average_length = self.total_length / doc_count if doc_count else 0
+        for token in tokens:
+            docs = self.postings.get(token, {})
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc, frequency in docs.items():
+                length = self.docs[doc][0]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length) if average_length else BM25_K1
+                scores[doc] = scores.get(doc, 0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return scores
+
+    @staticmethod
+    def parse_query(query):
+        phrases, terms = [], []
+        for phrase, term in QUERY_RE.findall(query):
+            if phrase:
+                words = word_tokens(phrase)
+                if len(words) > 1:
+                    phrases.append(words)
+                terms.extend(words)
+            else:
+                words = word_tokens(term)
+                if words and term.endswith("*"):
+                    words[-1] += "*"
+                terms.extend(words)
+        return terms, phrases
+
+    # Ranked entries matching every term of the query, optionally limited to some versions and kinds
+    def search(self, query, versions=None, kinds=None, limit=20):
+        terms, phrases = self.parse_query(query)
+        if not terms:
+            return []
+        with self._lock:
+            scores = None
+            for term in terms:
+                if term.endswith("*"):
+                    prefix = term[:-1]
+                    if len(prefix) < MIN_PREFIX_LENGTH:
+                        continue
+                    term_scores = self._term_scores(self._expand_prefix(prefix))
+                else:
+                    term_scores = self._term_scores([term])
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc: score + term_scores[doc] for doc, score in scores.items() if doc in term_scores}
+                if not scores:
+                    return []
+            if scores is None:
+                return []
+            candidates = [(score, doc) for doc, score in scores.items()
+                          if (versions is None or doc[0] in versions) and (kinds is None or doc[1] in kinds)]
+            # Phrases may reject candidates, so only plain queries can stop at the top few
+            if phrases:
+                candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+            else:
+                candidates = heapq.nlargest(limit, candidates, key=lambda candidate: candidate[0])
+            refs = {doc: self.docs[doc][1] for _, doc in candidates}
+        patterns = [re.compile(r"\W+".join(re.escape(word) for word in words), re.IGNORECASE) for words in phrases]
+        first_term = terms[0].rstrip("*")
+        results = []
+        for score, doc in candidates:
+            text = self.load_text(refs[doc])
+            if patterns and not all(pattern.search(text) for pattern in patterns):
+                continue
+            match = (patterns[0] if patterns else re.compile(re.escape(first_term), re.IGNORECASE)).search(text)
+            results.append(SearchResult(*doc, score, make_snippet(text, match)))
+            if len(results) >= limit:
+                break
+        return results
+
+
+def make_snippet(text, match, width=80):
+    if match is None:
+        return text[:2 * width].replace("\n", " ")
+    start = max(0, match.start() - width)
+    end = min(len(text), match.end() + width)
+    snippet = text[start:end].replace("\n", " ")
+    return ("..." if start else "") + snippet + ("..." if end < len(text) else "")
@@ -0,0 +1,223 @@
+import os
+import zlib
+import shutil
+import codecs
+import threading
+import weakref
+from collections import OrderedDict
+
+from compressed_text import pack_text, unpack_text, COMPRESS_LEVEL
+
+# Per-session accounting of the payloads kept in session state (notes, logs,
+# uploaded files, images, AI outputs). Each session keeps its payloads in a
+# SessionPayloads store and puts only the returned keys in session state. The
+# store counts the bytes each payload holds in memory and on disk; once a
+# session holds more than SESSION_MEMORY_QUOTA_BYTES in memory the least
+# recently used payloads are spilled to SPILL_DIR and reloaded when next read.
+# Uploads larger than the memory quota are streamed straight to disk, and a
+# session may not store more than SESSION_STORAGE_QUOTA_BYTES in total.
+SESSION_MEMORY_QUOTA_BYTES = int(os.environ.get("SESSION_MEMORY_QUOTA_BYTES", 64 * 1024 * 1024))
+SESSION_STORAGE_QUOTA_BYTES = int(os.environ.get("SESSION_STORAGE_QUOTA_BYTES", 1024 * 1024 * 1024))
+SPILL_DIR = os.environ.get("SESSION_SPILL_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "spill"))
+CHUNK_SIZE = 1024 * 1024
+PREVIEW_CHUNK_SIZE = 64 * 1024
+
+
+class QuotaExceededError(Exception):
+    def __init__(self, session_id, needed, available):
+        super().__init__(f"Storing {needed} bytes would exceed the session storage quota "
+                         f"({available} bytes left)")
+        self.session_id = session_id
+        self.needed = needed
+        self.available = available
+
+
+def _payload_size(value):
+    return len(value) if isinstance(value, bytes) else len(value.encode("utf-8"))
+
+
+def _remove_spill_dir(path):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+class SessionPayloads:
+    def __init__(self, session_id, memory_quota=SESSION_MEMORY_QUOTA_BYTES,
+                 storage_quota=SESSION_STORAGE_QUOTA_BYTES, spill_dir=SPILL_DIR):
+        self.session_id = session_id
+        self.memory_quota = memory_quota
+        self.storage_quota = storage_quota
+        self.spill_dir = os.path.join(spill_dir, session_id)
+        self._lock = threading.Lock()
+        self._resident = OrderedDict()  # key -> packed payload, least recently used first
+        self._spilled = set()
+        self._sizes = {}                # key -> (category, bytes held)
+        self._next_key = 0
+        # Spill files go away with the session
+        weakref.finalize(self, _remove_spill_dir, self.spill_dir)
+        _register(self)
+
+    def __contains__(self, key):
+        return key in self._sizes
+
+    def _new_key(self, category):
+        self._next_key += 1
+        return f"{category}-{self._next_key}"
+
+    def _check_quota(self, size):
+        available = self.storage_quota - self.total_bytes
+        if size > available:
+            raise QuotaExceededError(self.session_id, size, max(available, 0))
+
+    def _path(self, key):
+        return os.path.join(self.spill_dir, key)
+
+    def _write_spill(self, key, packed):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        data = packed if isinstance(packed, bytes) else zlib.compress(packed.encode("utf-8"), COMPRESS_LEVEL)
+        with open(self._path(key), "wb") as f:
+            f.write(data)
+        self._spilled.add(key)
+        self._sizes[key] = (self._sizes[key][0], len(data))
+
+    # Spill least recently used payloads until the session fits its memory quota
+    def _evict(self):
+        resident = self.resident_bytes
+        while resident > self.memory_quota and self._resident:
+            key, packed = self._resident.popitem(last=False)
+            resident -= self._sizes[key][1]
+            self._write_spill(key, packed)
+
+    # Store a text payload and return its key
+    def put(self, category, text):
+        packed = pack_text(text)
+        size = _payload_size(packed)
+        with self._lock:
+            self._check_quota(size)
+            key = self._new_key(category)
+            self._sizes[key] = (category, size)
+            self._resident[key] = packed
+            self._evict()
+        return key
+
+    # Store header plus the UTF-8 contents of a binary file object of the given size.
+    # Anything larger than the memory quota is compressed to disk in chunks without
+    # ever being held in memory whole.
+    def put_stream(self, category, fileobj, size, header=""):
+        if size + len(header) <= self.memory_quota:
+            return self.put(category, header + fileobj.read().decode("utf-8"))
+        with self._lock:
+            available = self.storage_quota - self.total_bytes
+            key = self._new_key(category)
+        os.makedirs(self.spill_dir, exist_ok=True)
+        compressor = zlib.compressobj(COMPRESS_LEVEL)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        written = 0
+        try:
+            with open(self._path(key), "wb") as f:
+                written += f.write(compressor.compress(header.encode("utf-8")))
+                for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+                    decoder.decode(chunk)  # raises UnicodeDecodeError like read().decode() would
+                    written += f.write(compressor.compress(chunk))
+                    if written > available:
+                        raise QuotaExceededError(self.session_id, size, max(available, 0))
+                decoder.decode(b"", final=True)
+                written += f.write(compressor.flush())
+            with self._lock:
+                self._check_quota(written)
+                self._sizes[key] = (category, written)
+                self._spilled.add(key)
+        except BaseException:  # bad UTF-8, quota, disk full, a failed upload read or an interrupted rerun
+            if os.path.exists(self._path(key)):
+                os.remove(self._path(key))
+            raise
+        return key
+
+    # Return a payload's text, reloading it from disk if it was spilled
+    def get(self, key):
+        with self._lock:
+            packed = self._resident.get(key)
+            if packed is not None:
+                self._resident.move_to_end(key)
+                return unpack_text(packed)
+            if key not in self._spilled:
+                raise KeyError(key)
+            with open(self._path(key), "rb") as f:
+                packed = f.read()
+            size = len(packed)
+            # Payloads too large to ever fit the quota are read from disk each time
+            if size <= self.memory_quota:
+                os.remove(self._path(key))
+                self._spilled.discard(key)
+                self._resident[key] = packed
+                self._evict()
+        return unpack_text(packed)
+
+    # The first limit characters of a payload, decompressing no more than needed
+    def preview(self, key, limit):
+        with self._lock:
+            packed = self._resident.get(key)
+            if packed is None and key in self._spilled:
+                decompressor = zlib.decompressobj()
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+                text = ""
+                with open(self._path(key), "rb") as f:
+                    while len(text) < limit:
+                        chunk = f.read(PREVIEW_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        text += decoder.decode(decompressor.decompress(chunk))
+                return text[:limit]
+        return self.get(key)[:limit]
+
+    def delete(self, key):
+        with self._lock:
+            self._resident.pop(key, None)
+            if key in self._spilled:
+                self._spilled.discard(key)
+                os.remove(self._path(key))
+            self._sizes.pop(key, None)
+
+    def is_spilled(self, key):
+        return key in self._spilled
+
+    @property
+    def resident_bytes(self):
+        return sum(self._sizes[key][1] for key in self._resident)
+
+    @property
+    def total_bytes(self):
+        return sum(size for _, size in self._sizes.values())
+
+    # Bytes and payload counts per category: {category: {"memory": b, "disk": b, "count": n}}
+    def usage(self):
+        usage = {}
+        with self._lock:
+            for key, (category, size) in self._sizes.items():
+                totals = usage.setdefault(category, {"memory": 0, "disk": 0, "count": 0})
+                totals["disk" if key in self._spilled else "memory"] += size
+                totals["count"] += 1
+        return usage
+
+
+_sessions = weakref.WeakValueDictionary()
+_sessions_lock = threading.Lock()
+
+
+def _register(payloads):
+    with _sessions_lock:
+        _sessions[payloads.session_id] = payloads
+
+
+# (session_id, memory bytes, disk bytes) for every live session, largest memory use first
+def all_session_usage():
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+    rows = []
+    for payloads in sessions:
+        usage = payloads.usage()
+        rows.append((payloads.session_id,
+                     sum(totals["memory"] for totals in usage.values()),
+                     sum(totals["disk"] for totals in usage.values())))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows
@@ -0,0 +1,150 @@
+import threading
+from collections import deque, namedtuple
+
+from project_store import open_project_store
+
+# Shared project workspaces. Every session working on a project sees the same
+# store; writes to one project are serialized by that project's own lock, so
+# sessions on different projects never wait on each other and readers never
+# lock. Edits use optimistic concurrency (see ProjectStore.update_entry), and
+# each write is recorded in a bounded change feed that sessions poll to learn
+# which versions and entries other sessions touched since their last rerun.
+# A session that falls further behind than the feed reaches is told to reload
+# everything rather than given a tail with changes missing.
+CHANGE_LOG_SIZE = 10000
+
+# index is the edited entry's position, or None for an append
+Change = namedtuple("Change", ["seq", "session_id", "app_version", "kind", "index"])
+
+
+class SharedWorkspace:
+    def __init__(self, store):
+        self.store = store
+        self.name = store.name
+        self.lock = threading.Lock()
+        self.changes = deque(maxlen=CHANGE_LOG_SIZE)
+        self.change_seq = 0
+        self.oldest_seq = 1  # seq of the oldest change still in the log
+
+    def session(self, session_id):
+        return WorkspaceSession(self, session_id)
+
+    # Run a write under the project lock and log it
+    def write(self, session_id, app_version, kind, index, method, *args):
+        with self.lock:
+            result = getattr(self.store, method)(app_version, *args)
+            self.change_seq += 1
+            self.changes.append(Change(self.change_seq, session_id, app_version, kind, index))
+            self.oldest_seq = self.changes[0].seq
+        return result
+
+    # Changes by other sessions after seq, and the latest seq. Changes is None when
+    # some after seq have already left the log; the caller must then reload everything.
+    def changes_since(self, seq, session_id=None):
+        latest = self.change_seq
+        retained = list(self.changes)
+        if seq + 1 < self.oldest_seq:
+            return None, latest
+        changes = [change for change in retained if seq < change.seq <= latest and change.session_id != session_id]
+        return changes, latest
+
+
+# A session's view of a shared workspace; reads go straight to the store
+class WorkspaceSession:
+    __slots__ = ("workspace", "session_id")
+    shared = True
+
+    def __init__(self, workspace, session_id):
+        self.workspace = workspace
+        self.session_id = session_id
+
+    @property
+    def name(self):
+        return self.workspace.name
+
+    @property
+    def store(self):
+        return self.workspace.store
+
+    def __contains__(self, app_version):
+        return app_version in self.store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __iter__(self):
+        return iter(self.store)
+
+    def get(self, app_version):
+        return self.store.get(app_version)
+
+    def versions(self):
+        return self.store.versions()
+
+    def snapshot(self):
+        return self.store.snapshot()
+
+    def to_context(self):
+        return self.store.to_context()
+
+    def entry_revision(self, app_version, kind, index):
+        return self.store.entry_revision(app_version, kind, index)
+
+    def iter_entries(self):
+        return self.store.iter_entries()
+
+    def search(self, query, versions=None, kinds=None, limit=20):
+        return self.store.search(query, versions, kinds, limit)
+
+    def get_blob(self, key):
+        return self.store.get_blob(key)
+
+    # Blobs are immutable and content-addressed, so storing one needs no lock
+    def put_blob(self, text):
+        return self.store.put_blob(text)
+
+    def add_blob_ref(self, app_version, kind, key):
+        return self.workspace.write(self.session_id, app_version, kind, None, "add_blob_ref", kind, key)
+
+    def add_version(self, app_version, interpreter=None):
+        return self.workspace.write(self.session_id, app_version, "version", None, "add_version", interpreter)
+
+    def add_note(self, app_version, text):
+        return self.workspace.write(self.session_id, app_version, "note", None, "add_note", text)
+
+    def add_requirements(self, app_version, project_type, python_version, content):
+        return self.workspace.write(self.session_id, app_version, "requirements", None, "add_requirements",
+                                    project_type, python_version, content)
+
+    def add_terminal_output(self, app_version, output):
+        return self.workspace.write(self.session_id, app_version, "terminal", None, "add_terminal_output", output)
+
+    def add_code_section(self, app_version, code):
+        return self.workspace.write(self.session_id, app_version, "code", None, "add_code_section", code)
+
+    # Raises ConflictError if another session changed the entry since expected_revision
+    def update_entry(self, app_version, kind, index, value, expected_revision):
+        return self.workspace.write(self.session_id, app_version, kind, index, "update_entry",
+                                    kind, index, value, expected_revision)
+
+    def changes_since(self, seq):
+        return self.workspace.changes_since(seq, self.session_id)
+
+    @property
+    def change_seq(self):
+        return self.workspace.change_seq
+
+
+_workspaces = {}
+_workspaces_lock = threading.Lock()
+
+
+# One workspace per project and process; the registry lock is only taken to open one
+def open_workspace(name):
+    workspace = _workspaces.get(name)
+    if workspace is None:
+        with _workspaces_lock:
+            workspace = _workspaces.get(name)
+            if workspace is None:
+                workspace = _workspaces[name] = SharedWorkspace(open_project_store(name))
+    return workspace
@@ -0,0 +1,55 @@
+import pytest
+from packaging.requirements import Requirement
+
+from preset_catalog import PresetRequirement, get_catalog
+
+
+def matches(line, query):
+    return PresetRequirement("preset", line, Requirement(line)).matches(Requirement(query).specifier)
+
+
+@pytest.mark.parametrize("line, query, expected", [
+    # ~= stops below the next release of its second-to-last component
+    ("pandas>=2.2.0", "pandas~=2.2.0", False),
+    ("pandas>=2.2.0,<2.3", "pandas~=2.2.0", True),
+    ("pandas==2.2.3", "pandas~=2.2.0", True),
+    ("pandas==2.3.0", "pandas~=2.2.0", False),
+    ("pandas~=2.2.1", "pandas~=2.2.0", True),
+    ("pandas~=2.2", "pandas~=2.2.0", False),
+    ("pandas~=2.2", "pandas<3", True),
+    # wildcard pins cover one release series
+    ("pandas>=2.0", "pandas==2.*", False),
+    ("pandas>=2.0,<3", "pandas==2.*", True),
+    ("pandas==2.1.*", "pandas==2.*", True),
+    ("pandas==2.*", "pandas==2.1.*", False),
+    ("pandas==2.*", "pandas<2.5", False),
+    ("pandas==2.*", "pandas!=3.*", True),
+    ("pandas>=2.0", "pandas!=3.*", False),
+    # open-ended ranges only fit open-ended queries
+    ("pandas>=2.0.0", "pandas<2.2", False),
+    ("pandas>=2.3", "pandas>=2.2", True),
+    ("pandas>=2.1", "pandas>=2.2", False),
+    ("pandas>2.2", "pandas>=2.2", True),
+    ("pandas", "pandas>=2.2", False),
+    ("pandas", "pandas", True),
+])
+def test_matches_only_when_every_allowed_version_fits(line, query, expected):
+    assert matches(line, query) is expected
+
+
+def test_find_excludes_open_ranges_for_compatible_release_query():
+    found = get_catalog().find("pandas~=2.2.0")
+    assert found
+    for req in found:
+        assert not req.requirement.specifier.contains("3.0.0")
+
+
+def test_search_filters_by_project_type_and_python_version():
+    catalog = get_catalog()
+    python_version = catalog.python_versions[0]
+    names = catalog.search("", python_version=python_version)
+    assert names == catalog.by_python_version[python_version]
+    project_type = catalog.get(names[0]).project_type
+    assert catalog.search("", project_type=project_type, python_version=python_version) == [
+        name for name in names if catalog.get(name).project_type == project_type]
+    assert catalog.search("", project_type="No such type") == []
@@ -0,0 +1,52 @@
+import time
+import uuid
+
+from report_jobs import (get_job_runtime, get_report_job_status, submit_report_job, submit_parallel_report_job,
+                         cancel_report_job, forget_report_job)
+
+
+# A snapshot large enough to take several seconds to render, and unique so it is never cached
+def long_snapshot(versions=("v1",)):
+    snapshot = {"task_list": list(versions), "interpreter_dict": {}, "requirements_dict": {}, "text_dict": {},
+                "terminal_dict": {}, "code_dict": {}}
+    for app_version in versions:
+        snapshot["interpreter_dict"][app_version] = "3.11"
+        snapshot["terminal_dict"][app_version] = ["\n".join(f"{uuid.uuid4()} line {i}" for i in range(400000))]
+    return snapshot
+
+
+def wait_until_running(job_id, timeout=120):
+    deadline = time.monotonic() + timeout
+    while get_report_job_status(job_id)["state"] != "running":
+        assert time.monotonic() < deadline, "job never started"
+        time.sleep(0.1)
+
+
+def wait_until_dropped(job_id, timeout=30):
+    runtime = get_job_runtime()
+    deadline = time.monotonic() + timeout
+    while any(key == job_id or key.startswith(f"{job_id}/") for key in runtime["status"].keys()):
+        assert time.monotonic() < deadline, "job bookkeeping was never dropped"
+        time.sleep(0.1)
+    assert job_id not in runtime["cancelled"]
+    assert job_id not in runtime["futures"]
+
+
+def test_cancel_then_forget_stops_running_job():
+    job_id = submit_report_job(long_snapshot())
+    future = get_job_runtime()["futures"][job_id]
+    wait_until_running(job_id)
+    cancel_report_job(job_id)
+    forget_report_job(job_id)
+    assert future.result(timeout=30) is None  # the worker stopped instead of publishing a report
+    wait_until_dropped(job_id)
+
+
+def test_cancel_then_forget_stops_running_parallel_job():
+    job_id = submit_parallel_report_job(long_snapshot(("v1", "v2")))
+    part_futures = list(get_job_runtime()["futures"][job_id])
+    wait_until_running(job_id)
+    cancel_report_job(job_id)
+    forget_report_job(job_id)
+    assert all(future.cancelled() or future.result(timeout=30) is None for future in part_futures)
+    wait_until_dropped(job_id)
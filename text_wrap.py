@@ -0,0 +1,77 @@
+from functools import lru_cache
+
+from reportlab.pdfbase.pdfmetrics import stringWidth, getFont
+
+# Width-aware line wrapping for PDF output. Character widths are measured once
+# per (font, size, character) and whole wrapped lines are memoized, so repeated
+# log lines and re-renders of the same content cost a dictionary lookup.
+BREAK_CHARS = " \t-/\\,;:.)]}"
+
+_char_widths = {}
+
+
+# Courier and other fixed-pitch fonts have a single advance width
+@lru_cache(maxsize=None)
+def monospace_width(font_name, font_size):
+    font = getFont(font_name)
+    widths = getattr(font, "widths", None)
+    if widths and len(set(w for w in widths if w)) == 1:
+        return stringWidth("M", font_name, font_size)
+    return None
+
+
+def char_width(ch, font_name, font_size):
+    key = (font_name, font_size, ch)
+    width = _char_widths.get(key)
+    if width is None:
+        width = stringWidth(ch, font_name, font_size)
+        _char_widths[key] = width
+    return width
+
+
+@lru_cache(maxsize=65536)
+def cached_string_width(text, font_name, font_size):
+    return stringWidth(text, font_name, font_size)
+
+
+# Wrap a single line (no newlines) to max_width points, preferring to break after BREAK_CHARS
+@lru_cache(maxsize=65536)
+def wrap_line(line, font_name, font_size, max_width):
+    fixed = monospace_width(font_name, font_size)
+    if fixed:
+        per_line = max(1, int(max_width // fixed))
+        if len(line) <= per_line:
+            return (line,)
+        return _split_at_breaks(line, [fixed] * len(line), max_width)
+    if cached_string_width(line, font_name, font_size) <= max_width:
+        return (line,)
+    return _split_at_breaks(line, [char_width(ch, font_name, font_size) for ch in line], max_width)
+
+
+def _split_at_breaks(line, widths, max_width):
+    pieces = []
+    start = 0
+    width = 0.0
+    last_break = -1
+    for i, w in enumerate(widths):
+        if width + w > max_width and i > start:
+            cut = last_break + 1 if last_break >= start else i
+            pieces.append(line[start:cut])
+            start = cut
+            width = sum(widths[start:i])
+            last_break = -1
+        width += w
+        if line[i] in BREAK_CHARS:
+            last_break = i
+    pieces.append(line[start:])
+    return tuple(pieces)
+
+
+# Wrap multi-line text in one pass; nothing is truncated
+def wrap_text_lines(text, font_name, font_size, max_width, tab_size=4):
+    lines = []
+    for line in text.split("\n"):
+        if "\t" in line:
+            line = line.expandtabs(tab_size)
+        lines.extend(wrap_line(line.rstrip("\r"), font_name, font_size, max_width))
+    return lines
@@ -1,499 +1,62 @@
 import streamlit as st
-from io import BytesIO
-import base64
-from streamlit_ace import st_ace
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-
-# ====================== PREDEFINED PRESETS ======================
-PRESETS = {
-    "Custom (Paste your own)": {
-        "project_type": "Custom Project",
-        "python_version": "",
-        "requirements": ""
-    },
-    "Testing Documentation App (Python 3.10.20)": {
-        "project_type": "Testing Documentation App",
-        "python_version": "Python 3.10.20",
-        "requirements": """streamlit==1.32.0
-streamlit-ace==0.1.1
-reportlab==4.3.1
-google-generativeai==0.3.2
-streamlit-extras==0.3.5
-streamlit-option-menu==0.3.6
-speechrecognition==3.10.0
-requests>=2.31.0"""
-    },
-    "Open Job Postings (Python 3.14.6)": {
-        "project_type": "Open Job Postings",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.2.0
-plotly>=6.0.0
-openai>=1.35.0"""
-    },
-    "Business Reality Assessment Dashboard (Python 3.14.6)": {
-    "project_type": "Open Job Postings",
-    "python_version": "Python 3.14.6",
-    "requirements": """streamlit>=1.38.0
-pandas>=2.2.0"""
-}, 
-    "Python Code Snippets (Python 3.10.20)": {
-        "project_type": "Python Code Snippets",
-        "python_version": "Python 3.10.20",
-        "requirements": """streamlit==1.22.0
-scikit-learn==1.3.0
-pandas==2.0.3
-numpy==1.24.3"""
-    },
-    "Alternative To Polsia (Python 3.14.6)": {
-        "project_type": "Alternative To Polsia",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-openai>=1.0.0"""
-    },
-    "Thrift Store v1 (Python 3.14.6)": {
-        "project_type": "Thrift Store v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.2.0"""
-    },
-    "AI Construction Software (Python 3.14.6)": {
-        "project_type": "AI Construction Software",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.2.0                  # For any future data handling / reports
-plotly>=5.24.0"""
-    },
-    "Burst Agents To JSON (Python 3.14.6)": {
-        "project_type": "Burst Agents To JSON",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.2.0          # Good to have for future data handling
-openpyxl>=3.1.0        # If you want Excel export later"""
-    },
-    "Prompt Library (Python 3.14.6)": {
-        "project_type": "Prompt Library",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0"""
-    },
-    "Business Metrics Tracker (Python 3.14.6)": {
-        "project_type": "Business Metrics Tracker",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.0.0"""
-    },
-    "Godot Guide v1 (Python 3.14.6)": {
-        "project_type": "Godot Guide v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0"""
-    },
-    "Grok Build Guide (Python 3.14.6)": {
-        "project_type": "Grok Build Guide",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0"""
-    },
-    "Top Selling Products (Python 3.14.6)": {
-        "project_type": "Top Selling Products",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.42
-pandas>=2.2
-altair>=5.4
-numpy>=1.26
-pyarrow>=15.0"""
-    },
-    "C-D-O-Q-v-1 (Python 3.14.6)": {
-        "project_type": "C-D-O-Q-v-1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.2.0"""
-    },
-    "rsr-plus-stations-reporting-tool-v1 (Python 3.14.6)": {
-        "project_type": "rsr-plus-stations-reporting-tool-v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.2.0"""
-    },
-    ".EML To JSON (Python 3.14.6)": {
-        "project_type": ".EML To JSON",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.2.0"""
-    },
-    "Cannabis Business (Python 3.14.6)": {
-        "project_type": "Cannabis Business",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit==1.38.0"""
-    },
-    "Creator Risk Continuum (Python 3.14.6)": {
-        "project_type": "Creator Risk Continuum",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0"""
-    },
-    "Handoff MD Creator Guide (Python 3.14.6)": {
-        "project_type": "Handoff MD Creator Guide",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0"""
-    },
-    "OKR Tool (Python 3.14.6)": {
-        "project_type": "OKR Tool",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.0.0"""
-    },
-    "N8N Guide (Python 3.14.6)": {
-        "project_type": "N8N Guide",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.2.0"""
-    },
-    "Coding With Ai (Python 3.14.6)": {
-        "project_type": "Coding With Ai",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0"""
-    },
-    "Liner Regession (Python 3.14.6)": {
-        "project_type": "Liner Regession",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.35,<2.0
-scikit-learn>=1.4,<2.0
-pandas>=2.2,<3.0
-numpy>=1.26,<3.0
-plotly>=5.18.0"""
-    },
-    "amazon-rsr-plus-associate-tools-v1 (Python 3.14.6)": {
-        "project_type": "amazon-rsr-plus-associate-tools-v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.42.0"""
-    },
-    "W-R-D-v1 (Python 3.14.6)": {
-        "project_type": "W-R-D-v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0"""
-    },
-    "workplace accountability app (Python 3.14.6)": {
-        "project_type": "workplace accountability app",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.45.1
-watchdog>=6.0.0
-python-dateutil>=2.9.0.post0
-tzdata>=2025.2
-packaging>=25.0
-numpy>=2.2.6
-pandas>=2.2.3
-altair>=5.5.0
-pyarrow>=20.0.0
-protobuf>=6.31.0
-rich>=14.0.0
-requests>=2.32.3
-toml>=0.10.2
-typing_extensions>=4.13.2"""
-    },
-    "contradictory-data-driven-environment-v1 (Python 3.14.6)": {
-        "project_type": "contradictory-data-driven-environment-v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.45.0
-altair>=5.3.0
-pandas>=2.2.2
-numpy>=2.1.0
-pyarrow>=16.1.0"""
-    },
-    "Talk-time-wage-theft-tool (Python 3.14.6)": {
-        "project_type": "Talk-time-wage-theft-tool",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.2.0
-altair>=5.0.0"""
-    },
-    "amazon-rsr-plus-pick-stow-pack-v1 (Python 3.14.6)": {
-        "project_type": "amazon-rsr-plus-pick-stow-pack-v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.42.0
-pandas>=2.2.0
-altair>=5.4.0
-plotly>=5.24.0"""
-    },
-    "60-day-interval-amazon-events-reporting-tool-v1 (Python 3.14.6)": {
-        "project_type": "60-day-interval-amazon-events-reporting-tool-v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.42.0
-pandas==2.2.2
-altair==5.4.1"""
-    },
-    "helping-engaging-respectful-obsessed-amazon-rating-tool-v1 (Python 3.14.6)": {
-        "project_type": "helping-engaging-respectful-obsessed-amazon-rating-tool-v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.57.0
-pandas>=2.2.0
-plotly>=5.24.0"""
-    },
-    "amazon-rsr-complaint-tool-v1 (Python 3.14.6)": {
-        "project_type": "amazon-rsr-complaint-tool-v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.44.0
-pandas>=2.2.3
-numpy>=2.2.0"""
-    },
-    "Economics Tools (Python 3.14.6)": {
-        "project_type": "Economics Tools",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.38.0
-pandas>=2.2.0"""
-    },
-    "multi-page-streamlit-website-template-v1 (Python 3.14.6)": {
-        "project_type": "multi-page-streamlit-website-template-v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.39.0
-pandas>=2.2.0
-numpy>=1.26.0"""
-    },
-    "amazon-time-keeper-v1 (Python 3.14.6)": {
-        "project_type": "amazon-time-keeper-v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.32.0
-pandas>=2.0.0"""
-    },
-    "Kia-models (Python 3.14.6)": {
-        "project_type": "Kia-models",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.33,<2.0
-pandas>=2.2,<3.0"""
-    },
-    "Arc Raiders Workshop Checklist (Python 3.14.6)": {
-        "project_type": "Arc Raiders Workshop Checklist",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.30.0
-pandas>=2.0.0"""
-    },
-    "Property Worksheet (Python 3.14.6)": {
-        "project_type": "Property Worksheet",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit==1.42.0
-pandas==2.2.3
-fpdf==1.7.2"""
-    },
-    "Gas Station Locations (Python 3.14.6)": {
-        "project_type": "Gas Station Locations",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit==1.41.1
-pandas==2.2.3"""
-    },
-    "Writing Tools (Python 3.14.6)": {
-        "project_type": "Writing Tools",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.30.0
-google-generativeai>=0.5.0"""
-    },
-    "Speech To Text (Python 3.14.6)": {
-        "project_type": "Speech To Text",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.31.0
-SpeechRecognition>=3.10.0"""
-    },
-    "Speech To Text v1 (Python 3.14.6)": {
-        "project_type": "Speech To Text v1",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.31.0
-SpeechRecognition>=3.10.0
-pyaudio>=0.2.13"""
-    },
-    "Logistics Shipping Freight Tools (Python 3.14.6)": {
-        "project_type": "Logistics Shipping Freight Tools",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.39.0"""
-    },
-    "CRM (Python 3.14.6)": {
-        "project_type": "CRM",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit==1.40.0
-pandas==2.2.3
-numpy==2.1.2
-pyarrow==18.0.0"""
-    },
-    "Ideas To Software (Python 3.14.6)": {
-        "project_type": "Ideas To Software",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit==1.32.0
-streamlit-ace==0.1.1
-reportlab==4.3.1
-google-generativeai==0.3.2
-streamlit-extras==0.3.5
-streamlit-option-menu==0.3.6
-speechrecognition==3.10.0
-requests>=2.31.0"""
-    },
-    "Data CSV Filter (Python 3.14.6)": {
-        "project_type": "Data CSV Filter",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit==1.39.0
-pandas==2.2.2"""
-    },
-    "S3 Bucket Apps (Python 3.14.6)": {
-        "project_type": "S3 Bucket Apps",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.28.0
-pandas>=2.0.0
-s3fs>=2023.10.0"""
-    },
-    "Project Management Setup Tool (Python 3.14.6)": {
-        "project_type": "Project Management Setup Tool",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit==1.39.0
-pandas==2.3.3"""
-    },
-    "Task Regression (Python 3.14.6)": {
-        "project_type": "Task Regression",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit==1.50.0
-streamlit-ace==0.1.1
-reportlab==4.4.4"""
-    },
-    "xml-https-link-ripper-v1 (Python 3.13.14)": {
-        "project_type": "xml-https-link-ripper-v1",
-        "python_version": "Python 3.13.14",
-        "requirements": """streamlit==1.39.0
-pandas==2.2.3"""
-    },
-    "Job Boards v1 (Python 3.13.14)": {
-        "project_type": "Job Boards v1",
-        "python_version": "Python 3.13.14",
-        "requirements": """streamlit==1.39.00
-pandas>=2.2.3"""
-    },
-    "Tech Stacks For Companies (Python 3.13.14)": {
-        "project_type": "Tech Stacks For Companies",
-        "python_version": "Python 3.13.14",
-        "requirements": """streamlit>=1.31.0
-requests>=2.31.0
-reportlab>=4.0.9
-graphviz>=0.20.1"""
-    },
-    "Cyber Security Boilerplate App (Python 3.13.14)": {
-        "project_type": "Cyber Security Boilerplate App",
-        "python_version": "Python 3.13.14",
-        "requirements": """streamlit==1.39.00"""
-    },
-    "CRM v2 (Python 3.13.14)": {
-        "project_type": "CRM v2",
-        "python_version": "Python 3.13.14",
-        "requirements": """streamlit==1.38.0
-pandas==2.2.2
-plotly==5.22.0"""
-    },
-    "Streamlit Website (Python 3.13.14)": {
-        "project_type": "Streamlit Website",
-        "python_version": "Python 3.13.14",
-        "requirements": """streamlit==1.39.00"""
-    },
-    "IOT API Guide (Python 3.14.6)": {
-        "project_type": "IOT API Guide",
-        "python_version": "Python 3.14.6",
-        "requirements": """streamlit>=1.35.0
-requests>=2.31.0
-pandas>=2.0.0
-plotly>=5.15.0"""
-    },
-    "Data Mining (Python 3.10.20)": {
-        "project_type": "Data Mining",
-        "python_version": "Python 3.10.20",
-        "requirements": """streamlit==1.38.0
-pandas==2.2.2
-numpy==1.26.4
-matplotlib==3.9.2
-seaborn==0.13.2"""
-    },
-    "Company Business Rating System (Python 3.10.20)": {
-        "project_type": "Company Business Rating System",
-        "python_version": "Python 3.10.20",
-        "requirements": """streamlit==1.39.0
-pandas==2.2.3
-fuzzywuzzy==0.18.0
-python-levenshtein==0.26.0"""
-    },
-     "Deep Learning Boilerplate (Python 3.10.20)": {
-        "project_type": "Deep Learning Boilerplate",
-        "python_version": "Python 3.10.20",
-        "requirements": """streamlit==1.39.0
-tensorflow==2.17.0
-numpy==1.26.4
-pillow==10.4.0"""
-    },
-     "Market Analysis (Python 3.10.20)": {
-        "project_type": "Market Analysis",
-        "python_version": "Python 3.10.20",
-        "requirements": """streamlit==1.36.0
-pandas==2.2.2
-numpy==1.26.4
-matplotlib==3.8.4
-plotly==5.22.0
-scikit-learn==1.5.0"""
-    },
-    "Statistics-Formulas-Equations-Math (Python 3.13.14)": {
-        "project_type": "Statistics-Formulas-Equations-Math",
-        "python_version": "Python 3.13.14",
-        "requirements": """streamlit==1.38.0
-streamlit-option-menu==0.3.12
-numpy==2.1.2
-pandas==2.2.3"""
-    },
-    "Dependency Details (Python 3.13.14)": {
-        "project_type": "Dependency Details",
-        "python_version": "Python 3.13.14",
-        "requirements": """streamlit==1.39.0
-pandas==2.2.3"""
-    },
-    "SEO zero click search demo (Python 3.12.13)": {
-        "project_type": "zero click search demo",
-        "python_version": "Python 3.12.13",
-        "requirements": """streamlit==1.38.0
-plotly==5.24.0
-pandas==2.2.2
-pytrends==4.9.2
-requests>=2.31.0
-lxml>=4.9.3"""
-    },
-    "Quantitative Research (Python 3.13.14)": {
-        "project_type": "Quantitative Research",
-        "python_version": "Python 3.13.14",
-        "requirements": """streamlit==1.38.0
-pandas==2.2.3
-numpy==2.1.1
-matplotlib==3.9.2
-seaborn==0.13.2
-requests==2.32.3
-scipy==1.14.1"""
-    },
-     "CRM 2 (Python 3.13.14)": {
-        "project_type": "CRM 2",
-        "python_version": "Python 3.13.14",
-        "requirements": """streamlit==1.38.0
-pandas==2.2.2
-plotly==5.22.0"""
-    # Add more presets here in the future
-    }
-
-}    
-    
-# Function to create download PDF link
-def create_download_link_pdf(pdf_data, download_filename):
-    b64 = base64.b64encode(pdf_data).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="{download_filename}">Download PDF</a>'
-    return href
+import time
+import uuid
+from pdf_download import spool_pdf_file, publish_pdf_file, create_download_link_file, is_servable
+from project_bundle import write_bundle_file, read_bundle, BundleError, BUNDLE_EXTENSION
+from project_store import open_project_store, ConflictError, DEFAULT_PROJECT, PROJECT_DB_PATH, EDITABLE_KINDS
+from pdf_themes import THEMES, DEFAULT_THEME
+from saved_items_view import pick_versions, section_open, show_long_text
+from fragments import fragment, showing, changed, rerun_app
+from lazy_editor import lazy_ace
+from preset_catalog import get_catalog
+from packaging.requirements import InvalidRequirement
+from report_jobs import submit_report_job, submit_parallel_report_job, get_report_job_status, cancel_report_job, SessionReportJobs
 
 # Initialize session states
-if 'task_list' not in st.session_state:
-    st.session_state.task_list = []
-if 'text_dict' not in st.session_state:
-    st.session_state.text_dict = {}
-if 'code_dict' not in st.session_state:
-    st.session_state.code_dict = {}
-if 'interpreter_dict' not in st.session_state:
-    st.session_state.interpreter_dict = {}
-if 'terminal_dict' not in st.session_state:
-    st.session_state.terminal_dict = {}
-if 'requirements_dict' not in st.session_state:
-    st.session_state.requirements_dict = {}
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+# Shared and SQLite projects are picked by name; otherwise each session has one private project
+shared_workspace = st.sidebar.checkbox("Shared workspace", help="Work on the same project as other sessions on this server")
+project_name = (st.sidebar.text_input("Project:", value=DEFAULT_PROJECT)
+                if PROJECT_DB_PATH or shared_workspace else DEFAULT_PROJECT)
+if ('project' not in st.session_state or st.session_state.project.name != project_name
+        or st.session_state.project.shared != shared_workspace):
+    st.session_state.project = open_project_store(project_name, shared_workspace, st.session_state.session_id)
+    st.session_state.last_change_seq = st.session_state.project.change_seq if shared_workspace else 0
+project = st.session_state.project
+
+# Move a whole project between servers as a streamed bundle file
+with st.sidebar.expander("Project Bundle"):
+    if st.button("Export Project Bundle"):
+        bundle_path = spool_pdf_file(BUNDLE_EXTENSION)
+        write_bundle_file(project, bundle_path)
+        bundle_path = publish_pdf_file(bundle_path, BUNDLE_EXTENSION)
+        st.markdown(create_download_link_file(bundle_path, f"{project.name}{BUNDLE_EXTENSION}", "Download Bundle"),
+                    unsafe_allow_html=True)
+        if not is_servable(bundle_path) and PROJECT_DB_PATH:
+            st.caption(f"Or export it on the server: `python project_bundle.py export {project.name} <bundle>`")
+    bundle_upload = st.file_uploader("Import Project Bundle:", type=["gz", "jsonl"])
+    if bundle_upload is not None and st.button("Import Bundle"):
+        try:
+            counts = read_bundle(bundle_upload, project)
+            st.success(f"Imported {counts.get('version', 0)} versions and "
+                       f"{sum(n for t, n in counts.items() if t not in ('header', 'version', 'blob', 'skipped'))} "
+                       f"entries; skipped {counts.get('skipped', 0)} already in the project.")
+        except BundleError as e:
+            st.error(f"Could not import bundle: {e}")
+
+# Which presets use a package, optionally limited to versions (for planning bulk upgrades)
+with st.sidebar.expander("Preset Dependencies"):
+    dependency_query = st.text_input("Requirement:", placeholder="e.g. pandas<2.2 or streamlit-ace")
+    if dependency_query:
+        try:
+            matches = get_catalog().find(dependency_query)
+            st.write(f"{len({req.preset for req in matches})} presets")
+            for req in matches:
+                st.write(f"- {req.preset}: `{req.line}`")
+        except InvalidRequirement as e:
+            st.error(f"Invalid requirement: {e}")
 
 # ====================== MAIN APP ======================
 st.title("Testing Documentation App")
@@ -507,60 +70,76 @@ with col2:
     interpreter_version = st.text_input("Interpreter Version:", placeholder="e.g., Python 3.14.6")
 
 if st.button("Save Version Information"):
-    if app_version and app_version not in st.session_state.task_list:
-        st.session_state.task_list.append(app_version)
-        st.session_state.interpreter_dict[app_version] = interpreter_version
+    project.add_version(app_version, interpreter_version)
 
-if app_version:
+# Each section below is a fragment: its widgets rerun only that section. Saves
+# rerun the whole app only when the saved version is shown under Saved Items.
+@fragment
+def notes_section(app_version):
     st.header("Testing Notes")
     regression_notes = st.text_area("Enter Regression Testing Notes:")
     if st.button("Save Regression Testing Notes"):
-        if app_version not in st.session_state.text_dict:
-            st.session_state.text_dict[app_version] = []
-        st.session_state.text_dict[app_version].append(f"Regression Notes: {regression_notes}")
+        project.add_note(app_version, f"Regression Notes: {regression_notes}")
+        changed("saved", app_version)
+
 
-    # ==================== REQUIREMENTS.TXT & PROJECT INFO ====================
+# ==================== REQUIREMENTS.TXT & PROJECT INFO ====================
+@fragment
+def requirements_section(app_version, interpreter_version):
     st.header("requirements.txt & Project Info")
     
+    catalog = get_catalog()
+    preset_filter = st.text_input("Find Preset:", placeholder="Type a name, project type, package or Python version",
+                                  key="preset_filter")
+    col1, col2 = st.columns(2)
+    type_filter = col1.selectbox("Project Type:", ["Any"] + catalog.project_types, key="preset_type_filter")
+    python_filter = col2.selectbox("Python Version:", ["Any"] + catalog.python_versions, key="preset_python_filter")
+    preset_names = catalog.search(preset_filter, project_type=None if type_filter == "Any" else type_filter,
+                                  python_version=None if python_filter == "Any" else python_filter)
+    if not preset_names:
+        st.caption("No presets match; showing all.")
+        preset_names = catalog.names
+
     preset_choice = st.selectbox(
         "Choose Project Preset:",
-        options=list(PRESETS.keys()),
+        options=preset_names,
         index=0,
         help="Select a project type or Custom"
     )
 
-    selected = PRESETS[preset_choice]
+    selected = catalog.get(preset_choice)
 
-    st.info(f"**Selected Project Type:** {selected['project_type']}")
+    st.info(f"**Selected Project Type:** {selected.project_type}")
 
     requirements_input = st.text_area(
         "requirements.txt content:",
-        value=selected["requirements"],
+        value=selected.requirements,
         height=240,
         placeholder="Edit requirements here if needed...",
     )
 
     if st.button("Save requirements.txt"):
-        if app_version not in st.session_state.requirements_dict:
-            st.session_state.requirements_dict[app_version] = []
-        
-        entry = {
-            "project_type": selected["project_type"],
-            "python_version": selected["python_version"] or interpreter_version or "Not specified",
-            "content": requirements_input
-        }
-        st.session_state.requirements_dict[app_version].append(entry)
-        st.success(f"Saved for {app_version} - {selected['project_type']}")
-
-    # Terminal Output
+        project.add_requirements(
+            app_version,
+            project_type=selected.project_type,
+            python_version=selected.python_version or interpreter_version or "Not specified",
+            content=requirements_input
+        )
+        st.success(f"Saved for {app_version} - {selected.project_type}")
+        changed("saved", app_version)
+
+
+@fragment
+def terminal_section(app_version):
     st.header("Terminal Output")
     terminal_output = st.text_area("Enter Terminal Output:", height=200)
     if st.button("Save Terminal Output"):
-        if app_version not in st.session_state.terminal_dict:
-            st.session_state.terminal_dict[app_version] = []
-        st.session_state.terminal_dict[app_version].append(terminal_output)
+        project.add_terminal_output(app_version, terminal_output)
+        changed("saved", app_version)
+
 
-    # Code Sections
+@fragment
+def code_sections(app_version):
     st.header("Code Input Sections")
     if 'code_sections' not in st.session_state:
         st.session_state.code_sections = 1
@@ -570,108 +149,194 @@ if app_version:
 
     for i in range(st.session_state.code_sections):
         st.subheader(f"Code Section {i+1}")
-        code = st_ace(language="python", theme="monokai", key=f"ace-editor-{i}")
+        code = lazy_ace(f"ace-editor-{i}", "python")
         if st.button(f"Save Code Section {i+1}"):
-            if app_version not in st.session_state.code_dict:
-                st.session_state.code_dict[app_version] = []
-            st.session_state.code_dict[app_version].append(code)
+            project.add_code_section(app_version, code)
+            changed("saved", app_version)
+
+
+if app_version:
+    notes_section(app_version)
+    requirements_section(app_version, interpreter_version)
+    terminal_section(app_version)
+    code_sections(app_version)
+
+
+# ====================== SEARCH SAVED ITEMS ======================
+SEARCH_KIND_LABELS = {"note": "Notes", "requirements": "requirements.txt", "terminal": "Terminal Outputs",
+                      "code": "Code Sections"}
+SAVED_SECTION_KEYS = {"note": "notes", "requirements": "requirements", "terminal": "terminal", "code": "code"}
+
+
+# Show the result's version under Saved Items with its section open
+def jump_to_entry(app_version, kind):
+    st.session_state["saved-picked"] = app_version
+    st.session_state[f"saved-{app_version}-{SAVED_SECTION_KEYS[kind]}"] = True
+
+
+@fragment
+def search_section():
+    st.write("## Search Saved Items")
+    query = st.text_input("Search:", placeholder='e.g. KeyError, "most recent call", conn*', key="search_query")
+    col1, col2 = st.columns(2)
+    listed_versions = project.versions()
+    search_versions = col1.multiselect("Versions:", listed_versions, key="search_versions")
+    search_kinds = col2.multiselect("Entry Types:", list(SEARCH_KIND_LABELS), key="search_kinds",
+                                    format_func=SEARCH_KIND_LABELS.get)
+    if not query:
+        return
+    with st.spinner("Searching..."):
+        results = project.search(query, set(search_versions or listed_versions), set(search_kinds) or None)
+    if not results:
+        st.write("No matching entries.")
+    for i, result in enumerate(results):
+        col1, col2 = st.columns([5, 1])
+        col1.write(f"**{result.app_version}** - {SEARCH_KIND_LABELS[result.kind]} #{result.position + 1}")
+        col1.text(result.snippet)
+        if col2.button("Show", key=f"search-result-{i}", on_click=jump_to_entry,
+                       args=(result.app_version, result.kind)):
+            rerun_app()
+
+
+if len(project):
+    search_section()
 
 # ====================== DISPLAY SAVED ITEMS ======================
-st.write("## Saved Items")
-for app_version in st.session_state.task_list:
-    st.write(f"### App Version: {app_version}")
-    
-    if app_version in st.session_state.interpreter_dict:
-        st.write(f"**Interpreter Version:** {st.session_state.interpreter_dict[app_version]}")
-
-    if app_version in st.session_state.requirements_dict:
-        st.write("#### requirements.txt:")
-        for i, req in enumerate(st.session_state.requirements_dict[app_version]):
-            with st.expander(f"Entry {i+1} - {req['project_type']}"):
-                st.write(f"**Project Type:** {req['project_type']}")
-                st.write(f"**Python Version:** {req['python_version']}")
-                st.code(req['content'], language="text")
-
-    if app_version in st.session_state.text_dict:
-        st.write("#### Notes:")
-        for text in st.session_state.text_dict[app_version]:
-            st.write(f"- {text}")
-
-    if app_version in st.session_state.terminal_dict:
-        st.write("#### Terminal Outputs:")
-        for i, output in enumerate(st.session_state.terminal_dict[app_version]):
-            with st.expander(f"Terminal Output {i+1}"):
-                st.code(output, language="bash")
-
-    if app_version in st.session_state.code_dict:
-        st.write("#### Code Sections:")
-        for i, code in enumerate(st.session_state.code_dict[app_version]):
-            st.write(f"Code Section {i+1}:")
-            st.code(code, language="python")
+@fragment
+def saved_items():
+    st.write("## Saved Items")
+
+    # Versions other sessions changed since this session's last rerun
+    updated_versions = set()
+    if project.shared:
+        changes, st.session_state.last_change_seq = project.changes_since(st.session_state.last_change_seq)
+        if changes is None:
+            # Too far behind for the change log; rerun every section so all of them read the store afresh
+            st.session_state.changes_reloaded = True
+            rerun_app()
+            changes = []
+        updated_versions = {change.app_version for change in changes}
+        if st.session_state.pop("changes_reloaded", False):
+            st.info("Other sessions made more changes than can be listed; everything was reloaded.")
+        elif updated_versions:
+            st.info(f"Updated in other sessions: {', '.join(sorted(updated_versions))}")
+        st.button("Refresh Saved Items")
+
+    shown_versions = pick_versions(project.versions(), "saved")
+    showing("saved", shown_versions)
+    for app_version in shown_versions:
+        record = project.get(app_version)
+        updated = " (updated by another session)" if app_version in updated_versions else ""
+        st.write(f"### App Version: {app_version}{updated}")
+        
+        st.write(f"**Interpreter Version:** {record.interpreter}")
+
+        if record.requirements and section_open("requirements.txt", len(record.requirements), f"saved-{app_version}-requirements"):
+            for i, req in enumerate(record.requirements):
+                st.write(f"**Entry {i+1} - Project Type:** {req.project_type}")
+                st.write(f"**Python Version:** {req.python_version}")
+                show_long_text(lambda n: req.content[:n], "text", f"saved-{app_version}-requirements-{i}")
+
+        if record.notes and section_open("Notes", len(record.notes), f"saved-{app_version}-notes"):
+            for text in record.notes:
+                st.write(f"- {text}")
+
+        if record.terminal_keys and section_open("Terminal Outputs", len(record.terminal_keys), f"saved-{app_version}-terminal"):
+            for i, key in enumerate(record.terminal_keys):
+                st.write(f"Terminal Output {i+1}:")
+                output = project.get_blob(key)
+                show_long_text(lambda n: output[:n], "bash", f"saved-{app_version}-terminal-{i}")
+
+        if record.code_keys and section_open("Code Sections", len(record.code_keys), f"saved-{app_version}-code"):
+            for i, key in enumerate(record.code_keys):
+                st.write(f"Code Section {i+1}:")
+                code = project.get_blob(key)
+                show_long_text(lambda n: code[:n], "python", f"saved-{app_version}-code-{i}")
+
+
+saved_items()
+
+# ====================== EDIT SAVED ENTRY ======================
+ENTRY_LABELS = {"note": "Note", "terminal": "Terminal Output", "code": "Code Section"}
+
+
+@fragment
+def edit_entry_section():
+    with st.expander("Edit a Saved Entry"):
+        edit_version = st.selectbox("App Version:", project.versions(), key="edit_version")
+        edit_kind = st.selectbox("Entry Type:", list(EDITABLE_KINDS), key="edit_kind", format_func=ENTRY_LABELS.get)
+        entries = getattr(project.get(edit_version), EDITABLE_KINDS[edit_kind])
+        if entries:
+            edit_index = st.number_input("Entry #:", min_value=1, max_value=len(entries), step=1) - 1
+            # Remember the revision the edit is based on; saving fails if another session changed it since
+            edit_target = (edit_version, edit_kind, edit_index)
+            if st.session_state.get("edit_target") != edit_target:
+                st.session_state.edit_target = edit_target
+                st.session_state.edit_revision = project.entry_revision(*edit_target)
+                st.session_state.edit_text = entries[edit_index]
+            edited_text = st.text_area("Content:", key="edit_text", height=200)
+            if st.button("Save Changes"):
+                try:
+                    st.session_state.edit_revision = project.update_entry(*edit_target, edited_text,
+                                                                          st.session_state.edit_revision)
+                    st.success("Entry updated.")
+                    changed("saved", edit_version)
+                except ConflictError:
+                    st.session_state.edit_target = None
+                    st.error("This entry was changed in another session after you opened it. "
+                             "Click Refresh Saved Items to load the latest version before editing.")
+        else:
+            st.write("No saved entries of this type.")
+
+
+if len(project):
+    edit_entry_section()
 
 # ====================== GENERATE PDF ======================
+if 'report_job_id' not in st.session_state:
+    st.session_state.report_job_id = None
+if 'report_jobs' not in st.session_state:
+    st.session_state.report_jobs = SessionReportJobs()
+
+parallel_build = st.checkbox("Render app versions separately (parallel, cached)", value=len(project) > 1,
+                             help="Renders each changed version in its own worker process and reuses cached pages for the rest")
+
+report_mode = st.radio("Report Layout:", ["Standard", "Fast text"], horizontal=True,
+                       help="Fast text draws logs and code directly on the canvas; best for log-heavy reports")
+report_mode = "fast_text" if report_mode == "Fast text" else "standard"
+report_theme = st.selectbox("Report Theme:", list(THEMES.keys()), index=list(THEMES.keys()).index(DEFAULT_THEME))
+
 if st.button("Generate PDF"):
-    pdf_buffer = BytesIO()
-    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, leftMargin=36, rightMargin=36)
-    styles = getSampleStyleSheet()
-    pdf_elements = []
-
-    for app_version in st.session_state.task_list:
-        pdf_elements.append(Paragraph(f"App Version: {app_version}", styles['Heading1']))
-
-        if app_version in st.session_state.interpreter_dict:
-            pdf_elements.append(Paragraph(
-                f"Interpreter Version: {st.session_state.interpreter_dict[app_version]}",
-                styles['Normal']
-            ))
-            pdf_elements.append(Spacer(1, 12))
-
-        # Requirements Section
-        if app_version in st.session_state.requirements_dict:
-            pdf_elements.append(Paragraph("requirements.txt:", styles['Heading2']))
-            for i, req in enumerate(st.session_state.requirements_dict[app_version]):
-                if len(st.session_state.requirements_dict[app_version]) > 1:
-                    pdf_elements.append(Paragraph(f"Entry {i+1}:", styles['Heading3']))
-                
-                pdf_elements.append(Paragraph(f"Project Type: {req['project_type']}", styles['Normal']))
-                pdf_elements.append(Paragraph(f"Python Version: {req['python_version']}", styles['Normal']))
-                pdf_elements.append(Spacer(1, 8))
-                
-                req_style = ParagraphStyle(name='ReqStyle', fontName='Courier', fontSize=9,
-                                         leftIndent=10, rightIndent=10, leading=11, wordWrap='CJK')
-                pdf_elements.append(Preformatted(req['content'], req_style, maxLineLength=70))
-                pdf_elements.append(Spacer(1, 12))
-
-        # Notes
-        if app_version in st.session_state.text_dict:
-            pdf_elements.append(Paragraph("Notes:", styles['Heading2']))
-            for text in st.session_state.text_dict[app_version]:
-                pdf_elements.append(Paragraph(f"• {text}", styles['Normal']))
-            pdf_elements.append(Spacer(1, 12))
-
-        # Terminal Outputs
-        if app_version in st.session_state.terminal_dict:
-            pdf_elements.append(Paragraph("Terminal Outputs:", styles['Heading2']))
-            for i, output in enumerate(st.session_state.terminal_dict[app_version]):
-                if len(st.session_state.terminal_dict[app_version]) > 1:
-                    pdf_elements.append(Paragraph(f"Output {i+1}:", styles['Heading3']))
-                term_style = ParagraphStyle(name='TerminalStyle', fontName='Courier', fontSize=8,
-                                          leftIndent=10, rightIndent=10, leading=9, wordWrap='CJK')
-                pdf_elements.append(Preformatted(output, term_style, maxLineLength=65))
-                pdf_elements.append(Spacer(1, 12))
-
-        # Code Sections
-        if app_version in st.session_state.code_dict:
-            pdf_elements.append(Paragraph("Code Sections:", styles['Heading2']))
-            for i, code in enumerate(st.session_state.code_dict[app_version]):
-                if len(st.session_state.code_dict[app_version]) > 1:
-                    pdf_elements.append(Paragraph(f"Code Section {i+1}:", styles['Heading3']))
-                code_style = ParagraphStyle(name='CodeStyle', fontName='Courier', fontSize=8,
-                                          leftIndent=10, rightIndent=10, leading=9, wordWrap='CJK')
-                pdf_elements.append(Preformatted(code, code_style, maxLineLength=65))
-                pdf_elements.append(Spacer(1, 12))
-
-    doc.build(pdf_elements)
-    pdf_buffer.seek(0)
-    pdf_data = pdf_buffer.read()
-    st.markdown(create_download_link_pdf(pdf_data, "documentation.pdf"), unsafe_allow_html=True)
+    if st.session_state.report_job_id:
+        st.session_state.report_jobs.drop(st.session_state.report_job_id)
+    snapshot = project.snapshot()
+    if parallel_build:
+        job_id = submit_parallel_report_job(snapshot, report_mode, report_theme)
+    else:
+        job_id = submit_report_job(snapshot, report_mode, report_theme)
+    st.session_state.report_job_id = st.session_state.report_jobs.add(job_id)
+
+if st.session_state.report_job_id:
+    job_id = st.session_state.report_job_id
+    status_placeholder = st.empty()
+    if st.button("Cancel PDF Build"):
+        cancel_report_job(job_id)
+
+    # Poll the worker until the build finishes; any widget interaction interrupts this loop
+    while True:
+        status = get_report_job_status(job_id)
+        with status_placeholder.container():
+            if status["state"] in ("queued", "running", "merging"):
+                progress = status["done"] / status["total"] if status["total"] else 0.0
+                st.progress(progress, text=f"Building PDF ({status['state']})... {status['done']}/{status['total']} elements")
+            elif status["state"] == "done":
+                st.markdown(create_download_link_file(status["path"], "documentation.pdf"), unsafe_allow_html=True)
+            elif status["state"] == "cancelled":
+                st.warning("PDF build cancelled.")
+            elif status["state"] == "failed":
+                st.error(f"PDF build failed: {status['error']}")
+            else:
+                st.info("PDF build is no longer available. Generate it again.")
+        if status["state"] not in ("queued", "running", "merging"):
+            break
+        time.sleep(0.5)
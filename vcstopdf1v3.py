@@ -1,16 +1,9 @@
 import streamlit as st
-from io import BytesIO
-import base64
 from streamlit_ace import st_ace
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-
-# Function to create download PDF link
-def create_download_link_pdf(pdf_data, download_filename):
-    b64 = base64.b64encode(pdf_data).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="{download_filename}">Download PDF</a>'
-    return href
+from pdf_download import spool_pdf_file, publish_pdf_file, create_download_link_file
 
 # Initialize session states
 if 'task_list' not in st.session_state:
@@ -113,8 +106,8 @@ for app_version in st.session_state.task_list:
 
 # Generate PDF
 if st.button("Generate PDF"):
-    pdf_buffer = BytesIO()
-    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, leftMargin=36, rightMargin=36)
+    pdf_path = spool_pdf_file()
+    doc = SimpleDocTemplate(pdf_path, pagesize=letter, leftMargin=36, rightMargin=36)
     styles = getSampleStyleSheet()
 
     pdf_elements = []
@@ -176,9 +169,8 @@ if st.button("Generate PDF"):
     # Build the PDF document
     doc.build(pdf_elements)
     
-    # Output the PDF content
-    pdf_buffer.seek(0)
-    pdf_data = pdf_buffer.read()
+    # Publish the spooled PDF file
+    pdf_path = publish_pdf_file(pdf_path)
     
     # Create download link
-    st.markdown(create_download_link_pdf(pdf_data, "documentation.pdf"), unsafe_allow_html=True)
+    st.markdown(create_download_link_file(pdf_path, "documentation.pdf"), unsafe_allow_html=True)
@@ -1,50 +1,27 @@
 import streamlit as st
-from io import BytesIO
-import base64
-from streamlit_ace import st_ace
+from lazy_editor import lazy_ace
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 import google.generativeai as genai
 import json
-
-# Function to create download PDF link
-def create_download_link_pdf(pdf_data, download_filename):
-    b64 = base64.b64encode(pdf_data).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="{download_filename}">Download PDF</a>'
-    return href
+from pdf_download import spool_pdf_file, publish_pdf_file, create_download_link_file
+from project_store import open_project_store, DEFAULT_PROJECT, PROJECT_DB_PATH
 
 # Function to get saved items as context
 def get_saved_items_context():
-    context = {}
-    for app_version in st.session_state.task_list:
-        version_data = {}
-        if app_version in st.session_state.interpreter_dict:
-            version_data["interpreter_version"] = st.session_state.interpreter_dict[app_version]
-        if app_version in st.session_state.text_dict:
-            version_data["notes"] = st.session_state.text_dict[app_version]
-        if app_version in st.session_state.terminal_dict:
-            version_data["terminal_outputs"] = st.session_state.terminal_dict[app_version]
-        if app_version in st.session_state.code_dict:
-            version_data["code_sections"] = st.session_state.code_dict[app_version]
-        context[app_version] = version_data
-    return json.dumps(context, indent=2)
+    return json.dumps(st.session_state.project.to_context(), indent=2)
 
 # Initialize session states
-if 'task_list' not in st.session_state:
-    st.session_state.task_list = []
-if 'text_dict' not in st.session_state:
-    st.session_state.text_dict = {}
-if 'code_dict' not in st.session_state:
-    st.session_state.code_dict = {}
-if 'interpreter_dict' not in st.session_state:
-    st.session_state.interpreter_dict = {}
-if 'terminal_dict' not in st.session_state:
-    st.session_state.terminal_dict = {}
+# Projects persisted in SQLite are picked by name; otherwise each session has one project
+project_name = st.sidebar.text_input("Project:", value=DEFAULT_PROJECT) if PROJECT_DB_PATH else DEFAULT_PROJECT
+if 'project' not in st.session_state or st.session_state.project.name != project_name:
+    st.session_state.project = open_project_store(project_name)
 if 'gemini_api_key' not in st.session_state:
     st.session_state.gemini_api_key = ""
 if 'gemini_response' not in st.session_state:
     st.session_state.gemini_response = ""
+project = st.session_state.project
 
 # Main app layout
 st.title("Testing Documentation App")
@@ -86,18 +63,14 @@ with col2:
     interpreter_version = st.text_input("Interpreter Version:", placeholder="e.g., Python 3.10.11")
 
 if st.button("Save Version Information"):
-    if app_version and app_version not in st.session_state.task_list:
-        st.session_state.task_list.append(app_version)
-        st.session_state.interpreter_dict[app_version] = interpreter_version
+    project.add_version(app_version, interpreter_version)
 
 if app_version:
     # Default inputs
     st.header("Testing Notes")
     regression_notes = st.text_area("Enter Regression Testing Notes:")
     if st.button("Save Regression Testing Notes"):
-        if app_version not in st.session_state.text_dict:
-            st.session_state.text_dict[app_version] = []
-        st.session_state.text_dict[app_version].append(f"Regression Notes: {regression_notes}")
+        project.add_note(app_version, f"Regression Notes: {regression_notes}")
 
     # Terminal Output Section
     st.header("Terminal Output")
@@ -107,9 +80,7 @@ if app_version:
         help="Paste any relevant terminal output, error messages, or command results here"
     )
     if st.button("Save Terminal Output"):
-        if app_version not in st.session_state.terminal_dict:
-            st.session_state.terminal_dict[app_version] = []
-        st.session_state.terminal_dict[app_version].append(terminal_output)
+        project.add_terminal_output(app_version, terminal_output)
 
     # Multiple code editors
     st.header("Code Input Sections")
@@ -121,46 +92,38 @@ if app_version:
 
     for i in range(st.session_state.code_sections):
         st.subheader(f"Code Section {i+1}")
-        code = st_ace(
-            language="python",
-            theme="monokai",
-            key=f"ace-editor-{i}",
-            placeholder="Enter your code here..."
-        )
+        code = lazy_ace(f"ace-editor-{i}", "python", placeholder="Enter your code here...")
         if st.button(f"Save Code Section {i+1}"):
-            if app_version not in st.session_state.code_dict:
-                st.session_state.code_dict[app_version] = []
-            st.session_state.code_dict[app_version].append(code)
+            project.add_code_section(app_version, code)
 
 # Display saved items
 st.write("## Saved Items")
-for app_version in st.session_state.task_list:
-    st.write(f"### App Version: {app_version}")
+for record in project:
+    st.write(f"### App Version: {record.app_version}")
     
-    if app_version in st.session_state.interpreter_dict:
-        st.write(f"**Interpreter Version:** {st.session_state.interpreter_dict[app_version]}")
+    st.write(f"**Interpreter Version:** {record.interpreter}")
 
-    if app_version in st.session_state.text_dict:
+    if record.notes:
         st.write("#### Notes:")
-        for text in st.session_state.text_dict[app_version]:
+        for text in record.notes:
             st.write(f"- {text}")
 
-    if app_version in st.session_state.terminal_dict:
+    if record.terminal_keys:
         st.write("#### Terminal Outputs:")
-        for i, output in enumerate(st.session_state.terminal_dict[app_version]):
+        for i, output in enumerate(record.terminal_outputs):
             with st.expander(f"Terminal Output {i+1}"):
                 st.code(output, language="bash")
 
-    if app_version in st.session_state.code_dict:
+    if record.code_keys:
         st.write("#### Code Sections:")
-        for i, code in enumerate(st.session_state.code_dict[app_version]):
+        for i, code in enumerate(record.code_sections):
             st.write(f"Code Section {i+1}:")
             st.code(code, language="python")
 
 # Generate PDF
 if st.button("Generate PDF"):
-    pdf_buffer = BytesIO()
-    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, leftMargin=36, rightMargin=36)
+    pdf_path = spool_pdf_file()
+    doc = SimpleDocTemplate(pdf_path, pagesize=letter, leftMargin=36, rightMargin=36)
     styles = getSampleStyleSheet()
     pdf_elements = []
 
@@ -183,25 +146,24 @@ if st.button("Generate PDF"):
         pdf_elements.append(Spacer(1, 20))
 
     # Existing PDF generation logic
-    for app_version in st.session_state.task_list:
-        pdf_elements.append(Paragraph(f"App Version: {app_version}", styles['Heading1']))
+    for record in project:
+        pdf_elements.append(Paragraph(f"App Version: {record.app_version}", styles['Heading1']))
         
-        if app_version in st.session_state.interpreter_dict:
-            pdf_elements.append(Paragraph(
-                f"Interpreter Version: {st.session_state.interpreter_dict[app_version]}",
-                styles['Normal']
-            ))
-            pdf_elements.append(Spacer(1, 10))
+        pdf_elements.append(Paragraph(
+            f"Interpreter Version: {record.interpreter}",
+            styles['Normal']
+        ))
+        pdf_elements.append(Spacer(1, 10))
 
-        if app_version in st.session_state.text_dict:
+        if record.notes:
             pdf_elements.append(Paragraph("Notes:", styles['Heading2']))
-            for text in st.session_state.text_dict[app_version]:
+            for text in record.notes:
                 pdf_elements.append(Paragraph(f"- {text}", styles['Normal']))
             pdf_elements.append(Spacer(1, 10))
 
-        if app_version in st.session_state.terminal_dict:
+        if record.terminal_keys:
             pdf_elements.append(Paragraph("Terminal Outputs:", styles['Heading2']))
-            for i, output in enumerate(st.session_state.terminal_dict[app_version]):
+            for i, output in enumerate(record.terminal_outputs):
                 pdf_elements.append(Paragraph(f"Terminal Output {i+1}:", styles['Heading3']))
                 code_paragraph_style = ParagraphStyle(
                     name='TerminalStyle',
@@ -216,9 +178,9 @@ if st.button("Generate PDF"):
                 pdf_elements.append(terminal_paragraph)
                 pdf_elements.append(Spacer(1, 10))
 
-        if app_version in st.session_state.code_dict:
+        if record.code_keys:
             pdf_elements.append(Paragraph("Code Sections:", styles['Heading2']))
-            for i, code in enumerate(st.session_state.code_dict[app_version]):
+            for i, code in enumerate(record.code_sections):
                 pdf_elements.append(Paragraph(f"Code Section {i+1}:", styles['Heading3']))
                 code_paragraph_style = ParagraphStyle(
                     name='CodeStyle',
@@ -234,6 +196,5 @@ if st.button("Generate PDF"):
                 pdf_elements.append(Spacer(1, 10))
 
     doc.build(pdf_elements)
-    pdf_buffer.seek(0)
-    pdf_data = pdf_buffer.read()
-    st.markdown(create_download_link_pdf(pdf_data, "documentation.pdf"), unsafe_allow_html=True)
+    pdf_path = publish_pdf_file(pdf_path)
+    st.markdown(create_download_link_file(pdf_path, "documentation.pdf"), unsafe_allow_html=True)
@@ -1,17 +1,12 @@
 import streamlit as st
 from io import BytesIO
-import base64
 from streamlit_ace import st_ace
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 import os
-
-# Function to create download PDF link
-def create_download_link_pdf(pdf_data, download_filename):
-    b64 = base64.b64encode(pdf_data).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="{download_filename}">Download PDF</a>'
-    return href
+from pdf_download import spool_pdf_file, publish_pdf_file, create_download_link_file
+from image_store import ingest_image, PDF_IMAGE_WIDTH, PDF_IMAGE_HEIGHT
 
 # Initialize session states
 if 'task_list' not in st.session_state:
@@ -26,6 +21,8 @@ if 'terminal_dict' not in st.session_state:
     st.session_state.terminal_dict = {}
 if 'image_dict' not in st.session_state:
     st.session_state.image_dict = {}
+if 'image_blobs' not in st.session_state:
+    st.session_state.image_blobs = {}
 
 # Main app layout
 st.title("Testing Documentation App")
@@ -67,7 +64,7 @@ if app_version:
                 st.session_state.image_dict[app_version] = []
             for img in uploaded_images:
                 st.session_state.image_dict[app_version].append({
-                    'data': img.getvalue(),
+                    'hash': ingest_image(st.session_state.image_blobs, img.getvalue()),
                     'name': img.name,
                     'type': img.type
                 })
@@ -122,7 +119,7 @@ for app_version in st.session_state.task_list:
         if app_version in st.session_state.image_dict:
             st.write("Supporting Images:")
             for img_data in st.session_state.image_dict[app_version]:
-                st.image(img_data['data'], caption=img_data['name'])
+                st.image(st.session_state.image_blobs[img_data['hash']]['data'], caption=img_data['name'])
 
     # Display terminal outputs
     if app_version in st.session_state.terminal_dict:
@@ -140,8 +137,8 @@ for app_version in st.session_state.task_list:
 
 # Generate PDF
 if st.button("Generate PDF"):
-    pdf_buffer = BytesIO()
-    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, leftMargin=36, rightMargin=36)
+    pdf_path = spool_pdf_file()
+    doc = SimpleDocTemplate(pdf_path, pagesize=letter, leftMargin=36, rightMargin=36)
     styles = getSampleStyleSheet()
 
     pdf_elements = []
@@ -165,8 +162,8 @@ if st.button("Generate PDF"):
             if app_version in st.session_state.image_dict:
                 pdf_elements.append(Paragraph("Supporting Images:", styles['Heading3']))
                 for img_data in st.session_state.image_dict[app_version]:
-                    img_buffer = BytesIO(img_data['data'])
-                    pdf_img = Image(img_buffer, width=200, height=150)
+                    img_buffer = BytesIO(st.session_state.image_blobs[img_data['hash']]['pdf'])
+                    pdf_img = Image(img_buffer, width=PDF_IMAGE_WIDTH, height=PDF_IMAGE_HEIGHT)
                     pdf_elements.append(Paragraph(f"Image: {img_data['name']}", styles['Normal']))
                     pdf_elements.append(pdf_img)
                     pdf_elements.append(Spacer(1, 10))
@@ -211,9 +208,8 @@ if st.button("Generate PDF"):
     # Build the PDF document
     doc.build(pdf_elements)
     
-    # Output the PDF content
-    pdf_buffer.seek(0)
-    pdf_data = pdf_buffer.read()
+    # Publish the spooled PDF file
+    pdf_path = publish_pdf_file(pdf_path)
     
     # Create download link
-    st.markdown(create_download_link_pdf(pdf_data, "documentation.pdf"), unsafe_allow_html=True)
+    st.markdown(create_download_link_file(pdf_path, "documentation.pdf"), unsafe_allow_html=True)
@@ -1,6 +1,4 @@
 import streamlit as st
-from io import BytesIO
-import base64
 from streamlit_ace import st_ace
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted, Table, TableStyle
@@ -8,6 +6,8 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 import datetime
+from pdf_download import spool_pdf_file, publish_pdf_file, create_download_link_file
+from preset_catalog import get_catalog
 
 st.set_page_config(
     page_title="Testing Documentation App",
@@ -32,13 +32,8 @@ LANGUAGE_MAP = {
 
 FILE_OPTIONS = list(LANGUAGE_MAP.keys())
 
-# ====================== PREDEFINED PRESETS (kept from your code) ======================
-PRESETS = { ... }  # ← paste your full PRESETS dict here (unchanged)
-
-# ====================== HELPER FUNCTIONS ======================
-def create_download_link_pdf(pdf_data, filename):
-    b64 = base64.b64encode(pdf_data).decode()
-    return f'<a href="data:application/pdf;base64,{b64}" download="{filename}">📥 Download PDF</a>'
+# ====================== PREDEFINED PRESETS ======================
+PRESETS = get_catalog()  # loaded once per process from presets.json
 
 def get_ace_language(ext: str) -> str:
     return LANGUAGE_MAP.get(ext.lower(), "text")
@@ -94,15 +89,20 @@ with tab1:
     
     col1, col2 = st.columns(2)
     with col1:
-        preset_choice = st.selectbox("Choose Project Preset", list(PRESETS.keys()))
+        preset_filter = st.text_input("Find Preset", placeholder="Name, project type, package or Python version")
+        type_filter = st.selectbox("Project Type", ["Any"] + PRESETS.project_types)
+        python_filter = st.selectbox("Python Version", ["Any"] + PRESETS.python_versions)
+        preset_names = PRESETS.search(preset_filter, project_type=None if type_filter == "Any" else type_filter,
+                                      python_version=None if python_filter == "Any" else python_filter)
+        preset_choice = st.selectbox("Choose Project Preset", preset_names or PRESETS.names)
     with col2:
-        st.info(f"**Project Type:** {PRESETS[preset_choice]['project_type']}")
+        st.info(f"**Project Type:** {PRESETS.get(preset_choice).project_type}")
 
-    selected = PRESETS[preset_choice]
+    selected = PRESETS.get(preset_choice)
 
     requirements_input = st.text_area(
         "requirements.txt", 
-        value=selected["requirements"], 
+        value=selected.requirements, 
         height=200
     )
 
@@ -111,8 +111,8 @@ with tab1:
         if version not in st.session_state.requirements_dict:
             st.session_state.requirements_dict[version] = []
         st.session_state.requirements_dict[version].append({
-            "project_type": selected["project_type"],
-            "python_version": selected["python_version"] or "Not specified",
+            "project_type": selected.project_type,
+            "python_version": selected.python_version or "Not specified",
             "content": requirements_input
         })
         st.success("requirements.txt saved!")
@@ -283,8 +283,8 @@ with tab7:
     st.header("📄 Generate Documentation PDF")
     
     if st.button("📄 Generate Professional PDF", use_container_width=True):
-        pdf_buffer = BytesIO()
-        doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, 
+        pdf_path = spool_pdf_file()
+        doc = SimpleDocTemplate(pdf_path, pagesize=letter, 
                                leftMargin=0.6*inch, rightMargin=0.6*inch)
         styles = getSampleStyleSheet()
         elements = []
@@ -301,7 +301,7 @@ with tab7:
             # (same logic as your original PDF generation, just cleaner)
             
         doc.build(elements)
-        pdf_buffer.seek(0)
-        st.markdown(create_download_link_pdf(pdf_buffer.read(), f"documentation_{version}.pdf"), unsafe_allow_html=True)
+        pdf_path = publish_pdf_file(pdf_path)
+        st.markdown(create_download_link_file(pdf_path, f"documentation_{version}.pdf"), unsafe_allow_html=True)
 
 st.caption("Pro tip: Use the tabs above for the best experience. Everything is saved in session state until you refresh.")
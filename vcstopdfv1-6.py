@@ -1,22 +1,16 @@
 import streamlit as st
-from io import BytesIO
-import base64
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 import os
-
-# Function to create download PDF link
-def create_download_link_pdf(pdf_data, download_filename):
-    b64 = base64.b64encode(pdf_data).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="{download_filename}">Download PDF</a>'
-    return href
+from pdf_download import spool_pdf_file, publish_pdf_file, create_download_link_file
+from compressed_text import pack_text, unpack_text
 
 # Initialize session states
 if 'task_list' not in st.session_state:
     st.session_state.task_list = []
 if 'file_dict' not in st.session_state:
-    st.session_state.file_dict = {}  # Store the content of each uploaded file
+    st.session_state.file_dict = {}  # Store the (packed) content of each uploaded file
 if 'version_info' not in st.session_state:
     st.session_state.version_info = {}  # Store app and interpreter versions
 
@@ -59,7 +53,7 @@ if uploaded_files and app_version:
             # Handle non-text files or files with different encoding
             file_content = "Binary or non-UTF-8 content - cannot display"
         
-        st.session_state.file_dict[app_version][file_name] = file_content
+        st.session_state.file_dict[app_version][file_name] = pack_text(file_content)
 
 # Display uploaded files
 st.header("Codebase Preview")
@@ -80,13 +74,13 @@ if app_version in st.session_state.file_dict:
                 'css': 'css'
             }
             language = lang_map.get(ext, 'text')
-            st.code(file_content, language=language)
+            st.code(unpack_text(file_content), language=language)
 
 # Generate PDF
 if st.button("Generate and Download PDF"):
     if app_version and app_version in st.session_state.file_dict:
-        pdf_buffer = BytesIO()
-        doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, leftMargin=36, rightMargin=36)
+        pdf_path = spool_pdf_file()
+        doc = SimpleDocTemplate(pdf_path, pagesize=letter, leftMargin=36, rightMargin=36)
         styles = getSampleStyleSheet()
         pdf_elements = []
 
@@ -110,17 +104,16 @@ if st.button("Generate and Download PDF"):
                 leading=8,
                 wordWrap='CJK'
             )
-            code_paragraph = Preformatted(file_content, code_paragraph_style, maxLineLength=65)
+            code_paragraph = Preformatted(unpack_text(file_content), code_paragraph_style, maxLineLength=65)
             pdf_elements.append(code_paragraph)
             pdf_elements.append(Spacer(1, 10))
 
         # Build the PDF document
         doc.build(pdf_elements)
-        pdf_buffer.seek(0)
-        pdf_data = pdf_buffer.read()
+        pdf_path = publish_pdf_file(pdf_path)
 
         # Create download link
-        st.markdown(create_download_link_pdf(pdf_data, f"codebase_{app_version}.pdf"), unsafe_allow_html=True)
+        st.markdown(create_download_link_file(pdf_path, f"codebase_{app_version}.pdf"), unsafe_allow_html=True)
     else:
         st.warning("Please upload files and specify an app version before generating PDF.")
 
@@ -1,6 +1,4 @@
 import streamlit as st
-from io import BytesIO
-import base64
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -12,12 +10,7 @@ from streamlit_extras.buy_me_a_coffee import button
 from streamlit_option_menu import option_menu
 from streamlit_ace import st_ace
 import time
-
-# Function to create download PDF link
-def create_download_link_pdf(pdf_data, download_filename):
-    b64 = base64.b64encode(pdf_data).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="{download_filename}">Download PDF</a>'
-    return href
+from pdf_download import spool_pdf_file, publish_pdf_file, create_download_link_file
 
 # Initialize session states (only if not already initialized)
 def initialize_session_state():
@@ -191,8 +184,8 @@ elif selected == "PDF Generation":
     )
 
     if st.button("Generate PDF"):
-        pdf_buffer = BytesIO()
-        doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, leftMargin=36, rightMargin=36)
+        pdf_path = spool_pdf_file()
+        doc = SimpleDocTemplate(pdf_path, pagesize=letter, leftMargin=36, rightMargin=36)
         styles = getSampleStyleSheet()
         pdf_elements = []
 
@@ -238,10 +231,9 @@ elif selected == "PDF Generation":
                         pdf_elements.append(Spacer(1, 10))
 
             doc.build(pdf_elements)
-            pdf_buffer.seek(0)
-            pdf_data = pdf_buffer.read()
+            pdf_path = publish_pdf_file(pdf_path)
 
-        st.markdown(create_download_link_pdf(pdf_data, "documentation.pdf"), unsafe_allow_html=True)
+        st.markdown(create_download_link_file(pdf_path, "documentation.pdf"), unsafe_allow_html=True)
         st.success("PDF generated successfully!")
 
 # --- ABOUT PAGE ---
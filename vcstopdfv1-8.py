@@ -1,40 +1,47 @@
 import streamlit as st
-from io import BytesIO
-import base64
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 import os
 import requests
 from streamlit_extras.colored_header import colored_header
 from streamlit_extras.buy_me_a_coffee import button
 from streamlit_option_menu import option_menu
 import time
-
-# Function to create download PDF link
-def create_download_link_pdf(pdf_data, download_filename):
-    b64 = base64.b64encode(pdf_data).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="{download_filename}">Download PDF</a>'
-    return href
+import uuid
+from pdf_download import spool_pdf_file, publish_pdf_file, create_download_link_file
+from pdf_report import chunked_preformatted
+from pdf_themes import get_theme, doc_template_kwargs
+from compressed_text import pack_text, unpack_text
+from project_journal import open_journal, open_private_journal, check_project_name
+from project_store import DEFAULT_PROJECT
+from edit_history import PersistentMap, UndoHistory
 
 # Initialize session states
-def initialize_session_state():
-    if 'task_list' not in st.session_state:
-        st.session_state.task_list = []
-    if 'text_dict' not in st.session_state:
-        st.session_state.text_dict = {}
+# Project state lives in a journal and every change goes through record_event.
+# Each session has its own journal unless it opts into a shared project, whose
+# journal every session on this server works on. The session dicts are copies
+# of the journal state, refreshed on each rerun and after each change.
+# Terminal outputs and uploaded files are stored packed (see compressed_text).
+def initialize_session_state(project_name):
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    journal_key = project_name or st.session_state.session_id
+    if st.session_state.get('journal_key') != journal_key:
+        st.session_state.journal = (open_journal(project_name) if project_name
+                                    else open_private_journal(st.session_state.session_id))
+        st.session_state.journal_key = journal_key
+    load_project_state()
     if 'code_dict' not in st.session_state:
         st.session_state.code_dict = {}
-    if 'interpreter_dict' not in st.session_state:
-        st.session_state.interpreter_dict = {}
-    if 'terminal_dict' not in st.session_state:
-        st.session_state.terminal_dict = {}
-    if 'file_dict' not in st.session_state:
-        st.session_state.file_dict = {}
-    if 'ai_output_dict' not in st.session_state:
-        st.session_state.ai_output_dict = {}
 
-initialize_session_state()
+
+def load_project_state():
+    for key, value in st.session_state.journal.read_state().items():
+        st.session_state[key] = value
+
+
+def record_event(op, **fields):
+    st.session_state.journal.record(op, **fields)
+    load_project_state()
 
 # Streamlit app configurations
 st.set_page_config(page_title="CodeDocGen AI", page_icon=":scroll:", layout="wide")
@@ -82,6 +89,14 @@ with st.sidebar:
             },
         }
     )
+    shared_project = st.checkbox("Shared project", help="Work on the same project as other sessions on this server")
+    project_name = st.text_input("Project:", value=DEFAULT_PROJECT) if shared_project else None
+
+try:
+    initialize_session_state(check_project_name(project_name) if shared_project else None)
+except ValueError as e:
+    st.error(f"{e}. Project names cannot contain path separators or '..'.")
+    st.stop()
 
 button(username="cesarhfernandez")
 
@@ -103,16 +118,13 @@ if selected == "Project Setup":
 
     if st.button("Save Version Information", key="save_version"):
         if app_version and app_version not in st.session_state.task_list:
-            st.session_state.task_list.append(app_version)
-            st.session_state.interpreter_dict[app_version] = interpreter_version
+            record_event("add_version", app_version=app_version, interpreter=interpreter_version)
 
     if app_version:
         st.subheader("Testing Notes")
         regression_notes = st.text_area("Enter Regression Testing Notes:")
         if st.button("Save Regression Testing Notes", key="save_notes"):
-            if app_version not in st.session_state.text_dict:
-                st.session_state.text_dict[app_version] = []
-            st.session_state.text_dict[app_version].append(f"Regression Notes: {regression_notes}")
+            record_event("add_note", app_version=app_version, text=f"Regression Notes: {regression_notes}")
 
         st.subheader("Terminal Output")
         terminal_output = st.text_area(
@@ -121,9 +133,7 @@ if selected == "Project Setup":
             help="Paste any relevant terminal output, error messages, or command results here"
         )
         if st.button("Save Terminal Output", key="save_terminal"):
-            if app_version not in st.session_state.terminal_dict:
-                st.session_state.terminal_dict[app_version] = []
-            st.session_state.terminal_dict[app_version].append(terminal_output)
+            record_event("add_terminal_output", app_version=app_version, output=terminal_output)
 
         st.subheader("File Upload")
         uploaded_files = st.file_uploader("Upload your project files", accept_multiple_files=True)
@@ -132,10 +142,9 @@ if selected == "Project Setup":
             file_name = uploaded_file.name
             file_content = uploaded_file.read().decode()
 
-            if app_version not in st.session_state.file_dict:
-                st.session_state.file_dict[app_version] = {}
-
-            st.session_state.file_dict[app_version][file_name] = file_content
+            # The uploader keeps its files across reruns; only journal new or changed content
+            if st.session_state.file_dict.get(app_version, {}).get(file_name) != pack_text(file_content):
+                record_event("save_file", app_version=app_version, file_name=file_name, content=file_content)
 
 # --- CODE ANALYSIS PAGE ---
 elif selected == "Code Analysis":
@@ -234,10 +243,10 @@ elif selected == "Code Analysis":
 
             if st.button("Run AI Code Analysis"):
                 if gemini_api_key and st.session_state.ai_prompt:
-                    st.session_state.ai_output_dict[app_version] = {}
+                    record_event("clear_ai_outputs", app_version=app_version)
                     with st.spinner("Analyzing code with AI..."):
-                        for file_name, file_content in st.session_state.file_dict[app_version].items():
-                            prompt = f"Given the following code:\n\n{file_content}\n\n{st.session_state.ai_prompt}"
+                        for file_name, packed_content in st.session_state.file_dict[app_version].items():
+                            prompt = f"Given the following code:\n\n{unpack_text(packed_content)}\n\n{st.session_state.ai_prompt}"
                             url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={gemini_api_key}"
                             data = {
                                 "contents": [{
@@ -249,29 +258,48 @@ elif selected == "Code Analysis":
                                 response.raise_for_status()
                                 ai_response = response.json()
                                 generated_text = ai_response["candidates"][0]["content"]["parts"][0]["text"]
-                                st.session_state.ai_output_dict[app_version][file_name] = generated_text
+                                record_event("set_ai_output", app_version=app_version, file_name=file_name, text=generated_text)
                             except requests.exceptions.RequestException as e:
                                 st.error(f"Error calling Gemini API: {e}")
-                                st.session_state.ai_output_dict[app_version][file_name] = "Error: Could not connect to the API."
+                                record_event("set_ai_output", app_version=app_version, file_name=file_name,
+                                               text="Error: Could not connect to the API.")
                             except (KeyError, IndexError) as e:
                                 st.error(f"Error parsing Gemini API response: {e}. Full response: {response.text}")
-                                st.session_state.ai_output_dict[app_version][file_name] = "Error: Could not parse the API response."
+                                record_event("set_ai_output", app_version=app_version, file_name=file_name,
+                                               text="Error: Could not parse the API response.")
                     st.success("Code analysis complete!")
                 elif not st.session_state.ai_prompt:
                     st.warning("Please enter a prompt using the text area or voice input.")
 
             st.subheader("Code Files and AI Feedback")
             if app_version in st.session_state.file_dict:
+                # Review edits are persistent maps that share unchanged files, so each choice costs O(change)
                 if f"modified_code_{app_version}" not in st.session_state:
-                    st.session_state[f"modified_code_{app_version}"] = st.session_state.file_dict[app_version].copy()
-
-                for file_name, file_content in st.session_state.file_dict[app_version].items():
+                    st.session_state[f"modified_code_{app_version}"] = UndoHistory(PersistentMap(st.session_state.file_dict[app_version]))
+                history = st.session_state[f"modified_code_{app_version}"]
+
+                undo_col, redo_col = st.columns(2)
+                with undo_col:
+                    undo_clicked = st.button("Undo", key=f"undo_{app_version}", disabled=not history.can_undo)
+                with redo_col:
+                    redo_clicked = st.button("Redo", key=f"redo_{app_version}", disabled=not history.can_redo)
+                if undo_clicked or redo_clicked:
+                    if undo_clicked:
+                        history.undo()
+                    else:
+                        history.redo()
+                    # Point the radios at the restored state before they are drawn
+                    for file_name, packed_content in st.session_state.file_dict[app_version].items():
+                        applied = history.current.get(file_name, packed_content) != packed_content
+                        st.session_state[f"radio_{app_version}_{file_name}"] = "Apply AI Suggestion" if applied else "Keep Original"
+
+                for file_name, packed_content in st.session_state.file_dict[app_version].items():
                     with st.expander(f"Original Code: {file_name}"):
-                        st.code(file_content, language="python")
+                        st.code(unpack_text(packed_content), language="python")
 
-                    modified_code = st.session_state[f"modified_code_{app_version}"].get(file_name, file_content)
+                    modified_code = history.current.get(file_name, packed_content)
                     with st.expander(f"Modified Code: {file_name}"):
-                        st.code(modified_code, language="python")
+                        st.code(unpack_text(modified_code), language="python")
 
                     st.write(f"**AI Feedback for {file_name}:**")
                     feedback_key = f"feedback_{app_version}_{file_name}"
@@ -293,14 +321,22 @@ elif selected == "Code Analysis":
                     )
 
                     if apply_feedback == "Apply AI Suggestion" and ai_feedback != "No feedback available yet.":
-                        st.session_state[f"modified_code_{app_version}"][file_name] = ai_feedback
+                        chosen = pack_text(ai_feedback)
                     elif apply_feedback == "Keep Original":
-                        st.session_state[f"modified_code_{app_version}"][file_name] = file_content
+                        chosen = packed_content
+                    else:
+                        chosen = modified_code
+                    if chosen != modified_code:
+                        history.push(history.current.set(file_name, chosen))
 
                     st.markdown("---")
 
                 if st.button("Finalize Changes", key=f"finalize_{app_version}"):
-                    st.session_state.file_dict[app_version] = st.session_state[f"modified_code_{app_version}"].copy()
+                    # Journal only the files that actually changed
+                    for file_name, modified_code in history.current.items():
+                        if st.session_state.file_dict[app_version].get(file_name) != modified_code:
+                            record_event("edit_file", app_version=app_version, file_name=file_name,
+                                           content=unpack_text(modified_code))
                     st.success("Changes finalized and applied to the project files!")
 
         else:
@@ -317,9 +353,10 @@ elif selected == "PDF Generation":
     )
 
     if st.button("Generate PDF"):
-        pdf_buffer = BytesIO()
-        doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, leftMargin=36, rightMargin=36)
-        styles = getSampleStyleSheet()
+        pdf_path = spool_pdf_file()
+        theme = get_theme("print")
+        doc = SimpleDocTemplate(pdf_path, **doc_template_kwargs(theme))
+        styles = theme["styles"]
         pdf_elements = []
 
         with st.spinner("Generating PDF..."):
@@ -340,34 +377,27 @@ elif selected == "PDF Generation":
                     pdf_elements.append(Paragraph("Terminal Outputs:", styles['Heading2']))
                     for i, output in enumerate(st.session_state.terminal_dict[app_version]):
                         pdf_elements.append(Paragraph(f"Terminal Output {i+1}:", styles['Heading3']))
-                        code_paragraph_style = ParagraphStyle(name='TerminalStyle', fontName='Courier', fontSize=8, leftIndent=10, rightIndent=10, leading=8, wordWrap='CJK')
-                        terminal_paragraph = Preformatted(output, code_paragraph_style, maxLineLength=65)
-                        pdf_elements.append(terminal_paragraph)
+                        pdf_elements.extend(chunked_preformatted(unpack_text(output), styles['TerminalStyle'], theme["frame_width"], theme["frame_height"]))
                         pdf_elements.append(Spacer(1, 10))
 
                 if app_version in st.session_state.file_dict:
                     pdf_elements.append(Paragraph("Uploaded Files:", styles['Heading2']))
                     for file_name, file_content in st.session_state.file_dict[app_version].items():
                         pdf_elements.append(Paragraph(f"File: {file_name}", styles['Heading3']))
-                        code_paragraph_style = ParagraphStyle(name='CodeStyle', fontName='Courier', fontSize=8, leftIndent=10, rightIndent=10, leading=8, wordWrap='CJK')
-                        code_paragraph = Preformatted(file_content, code_paragraph_style, maxLineLength=65)
-                        pdf_elements.append(code_paragraph)
+                        pdf_elements.extend(chunked_preformatted(unpack_text(file_content), styles['CodeStyle'], theme["frame_width"], theme["frame_height"]))
                         pdf_elements.append(Spacer(1, 10))
 
                 if app_version in st.session_state.ai_output_dict:
                     pdf_elements.append(Paragraph("AI Code Suggestions:", styles['Heading2']))
                     for file_name, ai_output in st.session_state.ai_output_dict[app_version].items():
                         pdf_elements.append(Paragraph(f"AI Suggestion for {file_name}:", styles['Heading3']))
-                        code_paragraph_style = ParagraphStyle(name='CodeStyle', fontName='Courier', fontSize=8, leftIndent=10, rightIndent=10, leading=8, wordWrap='CJK')
-                        code_paragraph = Preformatted(ai_output, code_paragraph_style, maxLineLength=65)
-                        pdf_elements.append(code_paragraph)
+                        pdf_elements.extend(chunked_preformatted(ai_output, styles['CodeStyle'], theme["frame_width"], theme["frame_height"]))
                         pdf_elements.append(Spacer(1, 10))
 
             doc.build(pdf_elements)
-            pdf_buffer.seek(0)
-            pdf_data = pdf_buffer.read()
+            pdf_path = publish_pdf_file(pdf_path)
 
-        st.markdown(create_download_link_pdf(pdf_data, "documentation.pdf"), unsafe_allow_html=True)
+        st.markdown(create_download_link_file(pdf_path, "documentation.pdf"), unsafe_allow_html=True)
         st.success("PDF generated successfully!")
 
 # --- ABOUT PAGE ---
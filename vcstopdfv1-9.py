@@ -1,16 +1,12 @@
+import uuid
 import streamlit as st
-from io import BytesIO
-import base64
-from streamlit_ace import st_ace
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-
-# Function to create download PDF link
-def create_download_link_pdf(pdf_data, download_filename):
-    b64 = base64.b64encode(pdf_data).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="{download_filename}">Download PDF</a>'
-    return href
+from pdf_download import spool_pdf_file, publish_pdf_file, create_download_link_file, format_file_size
+from session_memory import SessionPayloads, QuotaExceededError, all_session_usage
+from saved_items_view import pick_versions, section_open, show_long_text
+from lazy_editor import lazy_ace
 
 # Predefined options
 COMPILERS = ["g++ (GNU C++)", "clang++ (LLVM)", "MSVC (Microsoft Visual C++)", "icc (Intel C++ Compiler)", "MinGW-w64", "Other"]
@@ -23,6 +19,12 @@ COMMON_LIBS = ["-lstdc++", "-lm", "-lpthread", "-lboost_system", "-lsfml-graphic
 DEPENDENCY_MANAGERS = ["None", "vcpkg", "Conan", "apt", "yum", "Homebrew", "Other"]
 
 # Initialize session states
+# Notes, test results, terminal outputs and code are kept in st.session_state.payloads;
+# the dicts below hold their keys
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'payloads' not in st.session_state:
+    st.session_state.payloads = SessionPayloads(st.session_state.session_id)
 if 'task_list' not in st.session_state:
     st.session_state.task_list = []
 if 'text_dict' not in st.session_state:
@@ -38,6 +40,43 @@ if 'terminal_dict' not in st.session_state:
 if 'test_results_dict' not in st.session_state:
     st.session_state.test_results_dict = {}
 
+payloads = st.session_state.payloads
+
+# Memory usage panel: this session's payloads by category, then every live session
+with st.sidebar.expander("Memory Usage"):
+    usage = payloads.usage()
+    if usage:
+        for category, totals in sorted(usage.items()):
+            st.write(f"**{category}** ({totals['count']}): {format_file_size(totals['memory'])} in memory, "
+                     f"{format_file_size(totals['disk'])} on disk")
+    else:
+        st.write("Nothing saved yet.")
+    st.caption(f"Quota: {format_file_size(payloads.memory_quota)} in memory, "
+               f"{format_file_size(payloads.storage_quota)} in total")
+    st.write("**All sessions:**")
+    for session_id, memory_bytes, disk_bytes in all_session_usage():
+        marker = " (you)" if session_id == st.session_state.session_id else ""
+        st.write(f"- {session_id[:8]}{marker}: {format_file_size(memory_bytes)} in memory, "
+                 f"{format_file_size(disk_bytes)} on disk")
+
+
+# Show a saved output, reading only as much of it as is on screen
+def show_payload(key, language, widget_key):
+    show_long_text(lambda n: payloads.preview(key, n), language, widget_key)
+
+
+# Detect file type of uploaded outputs and adjust language for display
+def payload_language(key):
+    first_line = payloads.preview(key, 1000).split("\n")[0]
+    if "Uploaded File:" in first_line:
+        filename = first_line.replace("Uploaded File: ", "").strip()
+        if filename.endswith(".json"):
+            return "json"
+        elif filename.endswith(".xml"):
+            return "xml"
+    return "bash"
+
+
 # Main app layout
 st.title("C++ Testing Documentation App")
 
@@ -112,7 +151,10 @@ if app_version:
     if st.button("Save Regression Testing Notes"):
         if app_version not in st.session_state.text_dict:
             st.session_state.text_dict[app_version] = []
-        st.session_state.text_dict[app_version].append(f"Regression Notes: {regression_notes}")
+        try:
+            st.session_state.text_dict[app_version].append(payloads.put("notes", f"Regression Notes: {regression_notes}"))
+        except QuotaExceededError as e:
+            st.error(str(e))
 
     # Step 3: Test Results
     st.header("Step 3: Test Results")
@@ -129,11 +171,15 @@ if app_version:
     if st.button("Save Test Results"):
         if app_version not in st.session_state.test_results_dict:
             st.session_state.test_results_dict[app_version] = []
-        if test_results_file:
-            test_content = test_results_file.read().decode("utf-8")
-            st.session_state.test_results_dict[app_version].append(f"Uploaded File: {test_results_file.name}\n{test_content}")
-        elif test_results_input:
-            st.session_state.test_results_dict[app_version].append(test_results_input)
+        try:
+            if test_results_file:
+                st.session_state.test_results_dict[app_version].append(payloads.put_stream(
+                    "test results", test_results_file, test_results_file.size,
+                    f"Uploaded File: {test_results_file.name}\n"))
+            elif test_results_input:
+                st.session_state.test_results_dict[app_version].append(payloads.put("test results", test_results_input))
+        except QuotaExceededError as e:
+            st.error(str(e))
 
     # Step 4: Terminal Output
     st.header("Step 4: Terminal Output")
@@ -150,11 +196,15 @@ if app_version:
     if st.button("Save Terminal Output"):
         if app_version not in st.session_state.terminal_dict:
             st.session_state.terminal_dict[app_version] = []
-        if terminal_output_file:
-            terminal_content = terminal_output_file.read().decode("utf-8")
-            st.session_state.terminal_dict[app_version].append(f"Uploaded File: {terminal_output_file.name}\n{terminal_content}")
-        elif terminal_output_input:
-            st.session_state.terminal_dict[app_version].append(terminal_output_input)
+        try:
+            if terminal_output_file:
+                st.session_state.terminal_dict[app_version].append(payloads.put_stream(
+                    "logs", terminal_output_file, terminal_output_file.size,
+                    f"Uploaded File: {terminal_output_file.name}\n"))
+            elif terminal_output_input:
+                st.session_state.terminal_dict[app_version].append(payloads.put("logs", terminal_output_input))
+        except QuotaExceededError as e:
+            st.error(str(e))
 
     # Step 5: Code Input Sections
     st.header("Step 5: C++ Code Input Sections")
@@ -168,22 +218,20 @@ if app_version:
         st.subheader(f"Code Section {i+1}")
         file_name = st.text_input(f"File Name {i+1}:", placeholder="e.g., main.cpp", key=f"file_{i}")
         file_version = st.text_input(f"File Version {i+1}:", placeholder="e.g., 1.0.0", key=f"fversion_{i}")
-        code = st_ace(
-            language="cpp",
-            theme="monokai",
-            key=f"ace-editor-{i}",
-            placeholder="Enter your C++ code here..."
-        )
+        code = lazy_ace(f"ace-editor-{i}", "cpp", placeholder="Enter your C++ code here...")
         if st.button(f"Save Code Section {i+1}"):
             if app_version not in st.session_state.code_dict:
                 st.session_state.code_dict[app_version] = []
                 st.session_state.file_dict[app_version] = []
-            st.session_state.code_dict[app_version].append(code)
-            st.session_state.file_dict[app_version].append(f"{file_name} (v{file_version})")
+            try:
+                st.session_state.code_dict[app_version].append(payloads.put("files", code or ""))
+                st.session_state.file_dict[app_version].append(f"{file_name} (v{file_version})")
+            except QuotaExceededError as e:
+                st.error(str(e))
 
 # Display saved items
 st.write("## Saved Documentation")
-for app_version in st.session_state.task_list:
+for app_version in pick_versions(st.session_state.task_list, "saved"):
     st.write(f"### App Version: {app_version}")
     
     # Display metadata
@@ -200,56 +248,36 @@ for app_version in st.session_state.task_list:
         st.write(f"**Testing Framework:** {meta['testing_framework']}")
 
     # Display text inputs
-    if app_version in st.session_state.text_dict:
-        st.write("#### Notes:")
-        for text in st.session_state.text_dict[app_version]:
-            st.write(f"- {text}")
+    notes = st.session_state.text_dict.get(app_version, [])
+    if notes and section_open("Notes", len(notes), f"saved-{app_version}-notes"):
+        for key in notes:
+            st.write(f"- {payloads.get(key)}")
 
     # Display test results
-    if app_version in st.session_state.test_results_dict:
-        st.write("#### Test Results:")
-        for i, result in enumerate(st.session_state.test_results_dict[app_version]):
-            with st.expander(f"Test Result {i+1}"):
-                # Detect file type and adjust language for display
-                if "Uploaded File:" in result:
-                    filename = result.split("\n")[0].replace("Uploaded File: ", "").strip()
-                    if filename.endswith(".json"):
-                        st.code(result, language="json")
-                    elif filename.endswith(".xml"):
-                        st.code(result, language="xml")
-                    else:
-                        st.code(result, language="bash")
-                else:
-                    st.code(result, language="bash")
+    test_results = st.session_state.test_results_dict.get(app_version, [])
+    if test_results and section_open("Test Results", len(test_results), f"saved-{app_version}-tests"):
+        for i, key in enumerate(test_results):
+            st.write(f"Test Result {i+1}:")
+            show_payload(key, payload_language(key), f"saved-{app_version}-tests-{i}")
 
     # Display terminal outputs
-    if app_version in st.session_state.terminal_dict:
-        st.write("#### Terminal Outputs:")
-        for i, output in enumerate(st.session_state.terminal_dict[app_version]):
-            with st.expander(f"Terminal Output {i+1}"):
-                # Detect file type and adjust language for display
-                if "Uploaded File:" in output:
-                    filename = output.split("\n")[0].replace("Uploaded File: ", "").strip()
-                    if filename.endswith(".json"):
-                        st.code(output, language="json")
-                    elif filename.endswith(".xml"):
-                        st.code(output, language="xml")
-                    else:
-                        st.code(output, language="bash")
-                else:
-                    st.code(output, language="bash")
+    terminal_outputs = st.session_state.terminal_dict.get(app_version, [])
+    if terminal_outputs and section_open("Terminal Outputs", len(terminal_outputs), f"saved-{app_version}-terminal"):
+        for i, key in enumerate(terminal_outputs):
+            st.write(f"Terminal Output {i+1}:")
+            show_payload(key, payload_language(key), f"saved-{app_version}-terminal-{i}")
 
     # Display code sections with file names
-    if app_version in st.session_state.code_dict:
-        st.write("#### Code Sections:")
-        for i, (code, file_info) in enumerate(zip(st.session_state.code_dict[app_version], st.session_state.file_dict[app_version])):
+    code_keys = st.session_state.code_dict.get(app_version, [])
+    if code_keys and section_open("Code Sections", len(code_keys), f"saved-{app_version}-code"):
+        for i, (key, file_info) in enumerate(zip(code_keys, st.session_state.file_dict[app_version])):
             st.write(f"Code Section {i+1} - {file_info}:")
-            st.code(code, language="cpp")
+            show_payload(key, "cpp", f"saved-{app_version}-code-{i}")
 
 # Generate PDF
 if st.button("Generate PDF"):
-    pdf_buffer = BytesIO()
-    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, leftMargin=36, rightMargin=36)
+    pdf_path = spool_pdf_file()
+    doc = SimpleDocTemplate(pdf_path, pagesize=letter, leftMargin=36, rightMargin=36)
     styles = getSampleStyleSheet()
 
     pdf_elements = []
@@ -274,14 +302,14 @@ if st.button("Generate PDF"):
         # Add text content
         if app_version in st.session_state.text_dict:
             pdf_elements.append(Paragraph("Notes:", styles['Heading2']))
-            for text in st.session_state.text_dict[app_version]:
-                pdf_elements.append(Paragraph(f"- {text}", styles['Normal']))
+            for key in st.session_state.text_dict[app_version]:
+                pdf_elements.append(Paragraph(f"- {payloads.get(key)}", styles['Normal']))
             pdf_elements.append(Spacer(1, 10))
 
         # Add test results
         if app_version in st.session_state.test_results_dict:
             pdf_elements.append(Paragraph("Test Results:", styles['Heading2']))
-            for i, result in enumerate(st.session_state.test_results_dict[app_version]):
+            for i, key in enumerate(st.session_state.test_results_dict[app_version]):
                 pdf_elements.append(Paragraph(f"Test Result {i+1}:", styles['Heading3']))
                 code_paragraph_style = ParagraphStyle(
                     name='TestStyle',
@@ -292,14 +320,14 @@ if st.button("Generate PDF"):
                     leading=8,
                     wordWrap='CJK'
                 )
-                test_paragraph = Preformatted(result, code_paragraph_style, maxLineLength=65)
+                test_paragraph = Preformatted(payloads.get(key), code_paragraph_style, maxLineLength=65)
                 pdf_elements.append(test_paragraph)
                 pdf_elements.append(Spacer(1, 10))
 
         # Add terminal output content
         if app_version in st.session_state.terminal_dict:
             pdf_elements.append(Paragraph("Terminal Outputs:", styles['Heading2']))
-            for i, output in enumerate(st.session_state.terminal_dict[app_version]):
+            for i, key in enumerate(st.session_state.terminal_dict[app_version]):
                 pdf_elements.append(Paragraph(f"Terminal Output {i+1}:", styles['Heading3']))
                 code_paragraph_style = ParagraphStyle(
                     name='TerminalStyle',
@@ -310,14 +338,14 @@ if st.button("Generate PDF"):
                     leading=8,
                     wordWrap='CJK'
                 )
-                terminal_paragraph = Preformatted(output, code_paragraph_style, maxLineLength=65)
+                terminal_paragraph = Preformatted(payloads.get(key), code_paragraph_style, maxLineLength=65)
                 pdf_elements.append(terminal_paragraph)
                 pdf_elements.append(Spacer(1, 10))
 
         # Add code content with file names
         if app_version in st.session_state.code_dict:
             pdf_elements.append(Paragraph("Code Sections:", styles['Heading2']))
-            for i, (code, file_info) in enumerate(zip(st.session_state.code_dict[app_version], st.session_state.file_dict[app_version])):
+            for i, (key, file_info) in enumerate(zip(st.session_state.code_dict[app_version], st.session_state.file_dict[app_version])):
                 pdf_elements.append(Paragraph(f"Code Section {i+1} - {file_info}:", styles['Heading3']))
                 code_paragraph_style = ParagraphStyle(
                     name='CodeStyle',
@@ -328,16 +356,15 @@ if st.button("Generate PDF"):
                     leading=8,
                     wordWrap='CJK'
                 )
-                code_paragraph = Preformatted(code, code_paragraph_style, maxLineLength=65)
+                code_paragraph = Preformatted(payloads.get(key), code_paragraph_style, maxLineLength=65)
                 pdf_elements.append(code_paragraph)
                 pdf_elements.append(Spacer(1, 10))
 
     # Build the PDF document
     doc.build(pdf_elements)
     
-    # Output the PDF content
-    pdf_buffer.seek(0)
-    pdf_data = pdf_buffer.read()
+    # Publish the spooled PDF file
+    pdf_path = publish_pdf_file(pdf_path)
     
     # Create download link
-    st.markdown(create_download_link_pdf(pdf_data, "cpp_documentation.pdf"), unsafe_allow_html=True)
+    st.markdown(create_download_link_file(pdf_path, "cpp_documentation.pdf"), unsafe_allow_html=True)
@@ -1,6 +1,4 @@
 import streamlit as st
-from io import BytesIO
-import base64
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -10,12 +8,7 @@ from streamlit_ace import st_ace
 from streamlit_extras.card import card
 import speech_recognition as sr
 import requests  # already in requirements
-
-# ====================== HELPER FUNCTIONS ======================
-def create_download_link_pdf(pdf_data, download_filename):
-    b64 = base64.b64encode(pdf_data).decode()
-    href = f'<a href="data:application/pdf;base64,{b64}" download="{download_filename}">📥 Download PDF</a>'
-    return href
+from pdf_download import spool_pdf_file, publish_pdf_file, create_download_link_file
 
 def get_file_language(file_name: str) -> str:
     name_lower = file_name.lower()
@@ -237,8 +230,8 @@ elif selected == "📄 Generate PDF":
         include_ai = st.checkbox("Include AI-generated notes/summaries (if available)")
 
         if st.button("📄 Generate PDF", type="primary"):
-            pdf_buffer = BytesIO()
-            doc = SimpleDocTemplate(pdf_buffer, pagesize=letter, 
+            pdf_path = spool_pdf_file()
+            doc = SimpleDocTemplate(pdf_path, pagesize=letter, 
                                     leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36)
             styles = getSampleStyleSheet()
             elements = []
@@ -262,9 +255,9 @@ elif selected == "📄 Generate PDF":
                 elements.append(Preformatted(st.session_state.ai_notes[version][:8000], code_style))
 
             doc.build(elements)
-            pdf_buffer.seek(0)
-            st.markdown(create_download_link_pdf(pdf_buffer.read(), f"codebase_{version}.pdf"), unsafe_allow_html=True)
+            pdf_path = publish_pdf_file(pdf_path)
+            st.markdown(create_download_link_file(pdf_path, f"codebase_{version}.pdf"), unsafe_allow_html=True)
     else:
         st.warning("Upload files first.")
 
-st.caption("Built with Streamlit 1.32.0 + your specified packages | Python 3.14.6 compatible")
+st.caption("Built with Streamlit 1.37.1 + your specified packages | Python 3.14.6 compatible")